@@ -1 +1,8 @@
-from .lu import lu, lu_pivoting
+from .lu import lu, lu_pivoting, lu_factor, lu_unpack
+from .cholesky import cholesky, ldlt, pack_tril, unpack_tril
+from .qr import qr, qr_factor, apply_q, householder
+from .triangular import solve_triangular
+from .batched import lu_pivoting_batched
+from .out_of_core import lu_factor_out_of_core, lu_solve_out_of_core
+from .tiled import lu_factor_tiled, cholesky_tiled, run_task_graph
+from .banded import pack_band, unpack_band, lu_banded
@@ -0,0 +1,122 @@
+import numpy as np
+
+
+def pack_band(A, kl, ku):
+    '''
+    Store the band of a matrix in LAPACK band storage
+
+    Input Params
+    ------------
+    A .............. square matrix (or a stack of them, ... x n x n)
+    kl ............. number of subdiagonals
+    ku ............. number of superdiagonals
+
+    Output Params
+    -------------
+    ab ............. band storage (... x (kl + ku + 1) x n), A[i, j] = ab[ku + i - j, j]
+    '''
+    A = np.asarray(A)
+    n = A.shape[-1]
+    ab = np.zeros(A.shape[:-2] + (kl + ku + 1, n), dtype=A.dtype)
+    for d in range(-kl, ku + 1):
+        # d-th diagonal, d > 0 above the main diagonal
+        ab[..., ku - d, max(d, 0):n + min(d, 0)] = np.diagonal(A, d, axis1=-2, axis2=-1)
+    return ab
+
+
+def unpack_band(ab, kl, ku):
+    '''
+    Expand band storage back to a square matrix
+
+    Input Params
+    ------------
+    ab ............. band storage (see pack_band)
+    kl ............. number of subdiagonals
+    ku ............. number of superdiagonals
+
+    Output Params
+    -------------
+    A .............. square matrix (or a stack of them)
+    '''
+    ab = np.asarray(ab)
+    n = ab.shape[-1]
+    A = np.zeros(ab.shape[:-2] + (n, n), dtype=ab.dtype)
+    i = np.arange(n)
+    for d in range(-kl, ku + 1):
+        rows = i[max(-d, 0):n - max(d, 0)]
+        A[..., rows, rows + d] = ab[..., ku - d, rows + d]
+    return A
+
+
+def lu_banded(ab, kl, ku):
+    '''
+    LU decomposition with partial pivoting of banded matrices
+
+    Every step works on the (kl + 1) x (kl + ku + 1) window of the band
+    below and right of the pivot, for a stack of matrices all at once.
+    The work is O(n kl (kl + ku)) per matrix.
+
+    Input Params
+    ------------
+    ab ............. band storage (... x (kl + ku + 1) x n), see pack_band
+    kl ............. number of subdiagonals
+    ku ............. number of superdiagonals
+
+    Output Params
+    -------------
+    lub ............ factors in band storage (... x (2 kl + ku + 1) x n) as in LAPACK gbtrf,
+                     U in the first kl + ku + 1 rows (kl more superdiagonals from
+                     the row interchanges), multipliers of L in the last kl rows
+    piv ............ pivoting indices (... x n), row j was interchanged with row piv[j]
+                     at step j
+    '''
+    ab = np.asarray(ab)
+    assert ab.shape[-2] == kl + ku + 1, 'ab must have kl + ku + 1 rows'
+    dtype = ab.dtype if np.issubdtype(ab.dtype, np.inexact) else np.float64
+    batch, n = ab.shape[:-2], ab.shape[-1]
+    kv = kl + ku
+    # kv zero columns past the end keep every window inside the array
+    lub = np.zeros((int(np.prod(batch)), 2 * kl + ku + 1, n + kv), dtype=dtype)
+    lub[:, kl:, :n] = ab.reshape(-1, kv + 1, n)
+    # slots of rows outside the matrix are not referenced in ab
+    for t in range(kl, 2 * kl + ku + 1):
+        lub[:, t, :max(kv - t, 0)] = 0
+        lub[:, t, max(n + kv - t, 0):] = 0
+    windows = band_windows(lub, kl + 1, kv + 1, kv)
+    piv = np.zeros((lub.shape[0], n), dtype=int)
+    rows = np.arange(lub.shape[0])
+    for j in range(n):
+        W = windows[:, j]
+        p = np.argmax(np.abs(W[:, :, 0]), axis=1)
+        piv[:, j] = j + p
+        if p.any():
+            W[:, [0]], W[rows, p, None] = W[rows, p, None], W[:, [0]]
+        pivot = W[:, 0, 0]
+        # all-zero pivot columns (singular matrices) are left as they are
+        pivot = np.where(pivot == 0, 1, pivot)
+        W[:, 1:, 0] /= pivot[:, None]
+        W[:, 1:, 1:] -= W[:, 1:, 0, None] * W[:, 0, None, 1:]
+    lub = lub[:, :, :n].reshape(batch + lub.shape[1:2] + (n,))
+    return lub, piv.reshape(batch + (n,))
+
+
+def band_windows(ab, rows, cols, diag):
+    '''
+    Writable view of the dense windows of a band storage array
+
+    Input Params
+    ------------
+    ab ............. C-contiguous band storage (batch x ld x n)
+    rows ........... number of rows of a window
+    cols ........... number of columns of a window
+    diag ........... row of ab holding the main diagonal
+
+    Output Params
+    -------------
+    W .............. view (batch x n' x rows x cols), W[:, j, r, c] is the matrix
+                     entry (j + r, j + c) stored at ab[:, diag + r - c, j + c]
+    '''
+    assert ab.flags.c_contiguous and diag + rows <= ab.shape[1] and diag + 1 >= cols
+    sb, sr, sc = ab.strides
+    n = ab.shape[2] - cols + 1
+    return np.lib.stride_tricks.as_strided(ab[:, diag], (ab.shape[0], n, rows, cols), (sb, sc, sr, sc - sr))
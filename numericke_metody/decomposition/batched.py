@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def lu_pivoting_batched(A, chunk_size=None):
+    '''
+    LU decompostion with partial pivoting of a stack of matrices
+
+    All matrices of a chunk are eliminated together, each step is one array
+    operation over the whole chunk. Chunks only bound the size of temporaries.
+
+    Input Params
+    ------------
+    A .............. array of square matrices (batch x n x n)
+    chunk_size ..... number of matrices eliminated together
+                     (default keeps a chunk around 2 MB)
+
+    Output Params
+    -------------
+    LU ............. compact factors (batch x n x n), strictly lower part of L and upper part of U
+    piv ............ pivoting indices (batch x n), A[i][piv[i]] = L[i] @ U[i]
+    '''
+    A = np.asarray(A)
+    assert len(A.shape) == 3 and A.shape[1] == A.shape[2]
+    dtype = A.dtype if np.issubdtype(A.dtype, np.inexact) else np.float64
+    LU = np.array(A, dtype=dtype)
+    batch, n, _ = LU.shape
+    piv = np.tile(np.arange(n), (batch, 1))
+    if chunk_size is None:
+        chunk_size = max(1, (1 << 18) // max(n * n, 1))
+    for s in range(0, batch, chunk_size):
+        _lu_pivoting_chunk(LU[s:s+chunk_size], piv[s:s+chunk_size])
+    return LU, piv
+
+
+def _lu_pivoting_chunk(LU, piv):
+    batch, n, _ = LU.shape
+    rows = np.arange(batch)
+    for k in range(n):
+        idx = np.argmax(np.abs(LU[:, k:, k]), axis=1) + k
+        row_k = LU[rows, k].copy()
+        LU[rows, k] = LU[rows, idx]
+        LU[rows, idx] = row_k
+        piv_k = piv[rows, k].copy()
+        piv[rows, k] = piv[rows, idx]
+        piv[rows, idx] = piv_k
+        if k == n - 1:
+            break
+        pivot = LU[:, k, k]
+        # all-zero pivot columns (singular matrices) are left as they are
+        pivot = np.where(pivot == 0, 1, pivot)
+        LU[:, k+1:, k] /= pivot[:, None]
+        LU[:, k+1:, k+1:] -= LU[:, k+1:, k, None] * LU[:, k, None, k+1:]
@@ -0,0 +1,159 @@
+import numpy as np
+from .triangular import solve_triangular
+
+
+def cholesky(A, packed=False, block_size=128):
+    '''
+    Cholesky decompostion of a symmetric positive definite matrix
+
+    Right-looking blocked algorithm, only the lower triangle of A is read.
+
+    Input Params
+    ------------
+    A .............. symmetric positive definite matrix
+    packed ......... return the factor in packed storage (see pack_tril)
+    block_size ..... number of columns factored per panel
+
+    Output Params
+    -------------
+    L .............. lower triangular matrix, A = L @ L.T
+                     (vector of length n(n+1)/2 if packed)
+    '''
+    A = np.asarray(A)
+    assert len(A.shape) == 2 and A.shape[0] == A.shape[1]
+    dtype = A.dtype if np.issubdtype(A.dtype, np.floating) else np.float64
+    L = np.array(A, dtype=dtype, order='C')
+    n = L.shape[0]
+    for j0 in range(0, n, block_size):
+        j1 = min(j0 + block_size, n)
+        _cholesky_unblocked(L[j0:j1, j0:j1], j0)
+        if j1 < n:
+            L21 = L[j1:, j0:j1]
+            solve_triangular(L[j0:j1, j0:j1], L21.T, lower=True, overwrite_b=True)
+            # lower block columns only, the upper triangle is never read
+            for c0 in range(j1, n, block_size):
+                c1 = min(c0 + block_size, n)
+                L[c0:, c0:c1] -= L21[c0-j1:] @ L21[c0-j1:c1-j1].T
+    L = np.tril(L)
+    if packed:
+        return pack_tril(L)
+    return L
+
+
+def ldlt(A, packed=False):
+    '''
+    LDL^T decompostion of a symmetric (possibly indefinite) matrix
+    with Bunch-Kaufman pivoting
+
+    D is block diagonal with 1x1 and 2x2 blocks, it is returned as its
+    diagonal d and subdiagonal e (e[k] != 0 marks the 2x2 block k, k+1).
+
+    Input Params
+    ------------
+    A .............. symmetric matrix
+    packed ......... return L in packed storage (see pack_tril)
+
+    Output Params
+    -------------
+    L .............. lower triangular matrix with ones on the diagonal
+                     (vector of length n(n+1)/2 if packed)
+    d .............. diagonal of D
+    e .............. subdiagonal of D
+    piv ............ pivoting indices, A[piv][:, piv] = L @ D @ L.T
+    '''
+    A = np.asarray(A)
+    assert len(A.shape) == 2 and A.shape[0] == A.shape[1]
+    dtype = A.dtype if np.issubdtype(A.dtype, np.floating) else np.float64
+    W = np.array(A, dtype=dtype)
+    n = W.shape[0]
+    d, e = np.zeros(n, dtype=dtype), np.zeros(max(n - 1, 0), dtype=dtype)
+    piv = np.arange(n)
+    alpha = (1 + np.sqrt(17)) / 8
+    k = 0
+    while k < n:
+        size, swap = 1, None
+        if k < n - 1:
+            col = np.abs(W[k+1:, k])
+            r = np.argmax(col) + k + 1
+            colmax, akk = col[r-k-1], np.abs(W[k, k])
+            if akk < alpha * colmax:
+                row = np.abs(W[k:, r])
+                row[r-k] = 0
+                rowmax = np.max(row)
+                if akk * rowmax >= alpha * colmax**2:
+                    pass
+                elif np.abs(W[r, r]) >= alpha * rowmax:
+                    swap = (k, r)
+                else:
+                    size, swap = 2, (k + 1, r)
+        if swap is not None and swap[0] != swap[1]:
+            i, j = swap
+            W[[i, j]] = W[[j, i]]
+            W[:, [i, j]] = W[:, [j, i]]
+            piv[[i, j]] = piv[[j, i]]
+        if size == 1:
+            d[k] = W[k, k]
+            # a zero pivot here means the whole column is zero (singular matrix)
+            if d[k] != 0:
+                l = W[k+1:, k] / d[k]
+                W[k+1:, k+1:] -= np.outer(l, W[k+1:, k])
+                W[k+1:, k] = l
+        else:
+            D = W[k:k+2, k:k+2].copy()
+            d[k], d[k+1], e[k] = D[0, 0], D[1, 1], D[1, 0]
+            det = D[0, 0] * D[1, 1] - D[1, 0]**2
+            D_inv = np.array([[D[1, 1], -D[1, 0]], [-D[1, 0], D[0, 0]]]) / det
+            C = W[k+2:, k:k+2]
+            Lb = C @ D_inv
+            W[k+2:, k+2:] -= Lb @ C.T
+            W[k+2:, k:k+2] = Lb
+            W[k+1, k] = 0
+        k += size
+    L = np.tril(W, -1)
+    L[np.arange(n), np.arange(n)] = 1
+    if packed:
+        return pack_tril(L), d, e, piv
+    return L, d, e, piv
+
+
+def pack_tril(L):
+    '''
+    Store lower triangle row by row in a vector of length n(n+1)/2
+
+    Input Params
+    ------------
+    L .............. square matrix
+
+    Output Params
+    -------------
+    Lp ............. packed lower triangle, L[i, j] = Lp[i*(i+1)//2 + j] for j <= i
+    '''
+    return L[np.tril_indices(L.shape[0])]
+
+
+def unpack_tril(Lp):
+    '''
+    Expand packed lower triangle back to a square matrix
+
+    Input Params
+    ------------
+    Lp ............. packed lower triangle (see pack_tril)
+
+    Output Params
+    -------------
+    L .............. lower triangular matrix
+    '''
+    n = int((np.sqrt(8 * len(Lp) + 1) - 1) / 2)
+    L = np.zeros((n, n), dtype=Lp.dtype)
+    L[np.tril_indices(n)] = Lp
+    return L
+
+
+def _cholesky_unblocked(A, offset):
+    n = A.shape[0]
+    for j in range(n):
+        if not A[j, j] > 0:
+            raise np.linalg.LinAlgError(f'Matrix is not positive definite (leading minor {offset + j + 1})')
+        A[j, j] = np.sqrt(A[j, j])
+        A[j+1:, j] /= A[j, j]
+        A[j+1:, j+1:] -= np.outer(A[j+1:, j], A[j+1:, j])
@@ -1,56 +1,135 @@
 import numpy as np
+from .triangular import solve_triangular
 
 
-def lu(A):
+def lu(A, unpack=True, block_size=128):
     '''
     LU decompostion
 
     Input Params
     ------------
     A .............. square matrix
+    unpack ......... return separate L and U instead of the compact LU array
+    block_size ..... number of columns factored per panel
 
     Output Params
     -------------
     L .............. lower triangular matrix with ones on the diagonal
     U .............. upper triangular matrix
+        or
+    LU ............. compact factor, strictly lower part of L and upper part of U
     '''
-    A = np.copy(A)
-    n = A.shape[0]
-    for k in range(n-1):
-        for i in range(k+1, n):
-            A[i, k] = A[i, k] / A[k, k]
-            for j in range(k+1, n):
-                A[i, j] = A[i, j] - A[i, k] * A[k, j]
-    I, J = np.eye(n), np.ones(n)
-    L_mask, U_mask = np.tril(J) - I, np.triu(J)
-    return L_mask * A + I, U_mask * A
+    LU, _ = lu_factor(A, pivoting=False, block_size=block_size)
+    if unpack:
+        return lu_unpack(LU)
+    return LU
 
 
-def lu_pivoting(A):
+def lu_pivoting(A, unpack=True, block_size=128):
     '''
     LU decompostion with partial pivoting
 
     Input Params
     ------------
     A .............. square matrix
+    unpack ......... return separate L and U instead of the compact LU array
+    block_size ..... number of columns factored per panel
 
     Output Params
     -------------
     L .............. lower triangular matrix with ones on the diagonal
     U .............. upper triangular matrix
-    piv ............ pivoting indices
-    '''
-    A = np.copy(A)
-    n = A.shape[0]
-    piv = np.arange(n)
-    for k in range(n-1):
-        idx = np.argmax(abs(A[k:, k])) + k
-        piv[[k, idx]] = piv[[idx, k]]
-        A[[k, idx]] = A[[idx, k]]
-        for i in range(k+1, n):
-            A[i, k] = A[i, k] / A[k, k]
-            for j in range(k+1, n):
-                A[i, j] = A[i, j] - A[i, k] * A[k, j]
-    I, J = np.eye(n), np.ones(n)
-    L_mask, U_mask = np.tril(J) - I, np.triu(J)   
-    return L_mask * A + I, U_mask * A, piv
+        or
+    LU ............. compact factor, strictly lower part of L and upper part of U
+    piv ............ pivoting indices, A[piv] = L @ U
+    '''
+    LU, piv = lu_factor(A, pivoting=True, block_size=block_size)
+    if unpack:
+        L, U = lu_unpack(LU)
+        return L, U, piv
+    return LU, piv
+
+
+def lu_factor(A, pivoting=True, block_size=128, overwrite_a=False):
+    '''
+    Right-looking blocked LU factorization
+
+    Columns are factored in panels of block_size; the trailing submatrix
+    is then updated by a single rank-block_size matrix product.
+
+    Input Params
+    ------------
+    A .............. matrix (m x n)
+    pivoting ....... use partial (row) pivoting
+    block_size ..... number of columns factored per panel
+    overwrite_a .... factor A in place if it is a floating point array
+
+    Output Params
+    -------------
+    LU ............. compact factor, strictly lower part of L and upper part of U
+    piv ............ pivoting indices, A[piv] = L @ U
+    '''
+    if overwrite_a and isinstance(A, np.ndarray) and np.issubdtype(A.dtype, np.inexact):
+        LU = A
+    else:
+        LU = _as_float_array(A)
+    m, n = LU.shape
+    k = min(m, n)
+    piv = np.arange(m)
+    for j0 in range(0, k, block_size):
+        j1 = min(j0 + block_size, k)
+        _factor_panel(LU, piv, j0, j1, pivoting)
+        if j1 < n:
+            solve_triangular(LU[j0:j1, j0:j1], LU[j0:j1, j1:], lower=True,
+                             unit_diagonal=True, overwrite_b=True)
+            if j1 < m:
+                LU[j1:, j1:] -= LU[j1:, j0:j1] @ LU[j0:j1, j1:]
+    return LU, piv
+
+
+def lu_unpack(LU):
+    '''
+    Split compact LU factor into L and U
+
+    Input Params
+    ------------
+    LU ............. compact factor returned by lu_factor
+
+    Output Params
+    -------------
+    L .............. lower triangular matrix with ones on the diagonal
+    U .............. upper triangular matrix
+    '''
+    m, n = LU.shape
+    k = min(m, n)
+    L = np.tril(LU[:, :k], -1)
+    L[np.arange(k), np.arange(k)] = 1
+    return L, np.triu(LU[:k])
+
+
+def _factor_panel(LU, piv, j0, j1, pivoting):
+    # recursive splitting keeps most of the panel work in matrix products
+    if j1 - j0 > 8:
+        jm = (j0 + j1) // 2
+        _factor_panel(LU, piv, j0, jm, pivoting)
+        solve_triangular(LU[j0:jm, j0:jm], LU[j0:jm, jm:j1], lower=True,
+                         unit_diagonal=True, overwrite_b=True)
+        LU[jm:, jm:j1] -= LU[jm:, j0:jm] @ LU[j0:jm, jm:j1]
+        _factor_panel(LU, piv, jm, j1, pivoting)
+        return
+    for j in range(j0, j1):
+        if pivoting:
+            idx = np.argmax(np.abs(LU[j:, j])) + j
+            if idx != j:
+                piv[[j, idx]] = piv[[idx, j]]
+                LU[[j, idx]] = LU[[idx, j]]
+        # an all-zero pivot column is left as it is (singular matrix)
+        if LU[j, j] != 0 or not pivoting:
+            LU[j+1:, j] /= LU[j, j]
+        LU[j+1:, j+1:j1] -= np.outer(LU[j+1:, j], LU[j, j+1:j1])
+
+
+def _as_float_array(A):
+    A = np.asarray(A)
+    dtype = A.dtype if np.issubdtype(A.dtype, np.inexact) else np.float64
+    return np.array(A, dtype=dtype, order='C')
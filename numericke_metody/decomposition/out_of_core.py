@@ -0,0 +1,97 @@
+import numpy as np
+from .lu import lu_factor
+from .triangular import solve_triangular
+
+
+def lu_factor_out_of_core(A, memory=2**30, panel_size=None):
+    '''
+    Left-looking LU factorization with partial pivoting of a matrix
+    larger than memory (e.g. np.memmap or np.lib.format.open_memmap)
+
+    A is overwritten by the compact factor. Columns are factored in panels;
+    a panel is loaded, updated by all previous panels read back from A one
+    at a time, factored in memory and written back. Row interchanges are
+    applied to the rest of A on disk, so A[piv] = L @ U as for lu_factor.
+    A Fortran-ordered file (order='F') keeps every panel contiguous on disk.
+
+    Input Params
+    ------------
+    A .............. square floating point array, overwritten in place
+    memory ......... bytes available for the panels in memory
+    panel_size ..... number of columns of a panel, None to derive it from memory
+
+    Output Params
+    -------------
+    LU ............. A holding the compact factor, strictly lower part of L and upper part of U
+    piv ............ pivoting indices, A[piv] = L @ U
+    '''
+    assert len(A.shape) == 2 and A.shape[0] == A.shape[1]
+    assert np.issubdtype(A.dtype, np.inexact), 'A must be a floating point array'
+    n = A.shape[0]
+    w = panel_size or _panel_size(n, A.dtype, memory)
+    piv = np.arange(n)
+    for j0 in range(0, n, w):
+        j1 = min(j0 + w, n)
+        P = np.array(A[:, j0:j1])
+        for k0 in range(0, j0, w):
+            k1 = min(k0 + w, j0)
+            L = np.asarray(A[k0:, k0:k1])
+            solve_triangular(L[:k1-k0], P[k0:k1], lower=True, unit_diagonal=True, overwrite_b=True)
+            P[k1:] -= L[k1-k0:] @ P[k0:k1]
+        _, p = lu_factor(P[j0:], pivoting=True, overwrite_a=True)
+        rows = np.flatnonzero(p != np.arange(n - j0))
+        # the interchanges of the panel are applied to all other columns
+        # (L of the previous panels, not yet loaded columns)
+        for c0 in range(0, n, w):
+            c1 = min(c0 + w, n)
+            if c1 > j0 and c0 < j1:
+                continue
+            A[j0 + rows, c0:c1] = A[j0 + p[rows], c0:c1]
+        piv[j0:] = piv[j0:][p]
+        A[:, j0:j1] = P
+        if isinstance(A, np.memmap):
+            A.flush()
+    return A, piv
+
+
+def lu_solve_out_of_core(LU, piv, b, memory=2**30, panel_size=None):
+    '''
+    Solve A x = b with the factor from lu_factor_out_of_core
+
+    LU is read panel by panel, twice (forward and backward substitution).
+
+    Input Params
+    ------------
+    LU ............. compact factor (e.g. np.memmap)
+    piv ............ pivoting indices
+    b .............. right-hand side vector or matrix (n x k)
+    memory ......... bytes available for a panel in memory
+    panel_size ..... number of columns of a panel, None to derive it from memory
+
+    Output Params
+    -------------
+    x .............. solution of the same shape as b
+    '''
+    b = np.asarray(b)
+    n = LU.shape[0]
+    w = panel_size or _panel_size(n, LU.dtype, 2 * memory)
+    x = np.array(b[piv], dtype=np.result_type(LU.dtype, b, np.float32))
+    x2 = x.reshape(n, -1)
+    for k0 in range(0, n, w):
+        k1 = min(k0 + w, n)
+        L = np.asarray(LU[k0:, k0:k1])
+        solve_triangular(L[:k1-k0], x2[k0:k1], lower=True, unit_diagonal=True, overwrite_b=True)
+        x2[k1:] -= L[k1-k0:] @ x2[k0:k1]
+    for k0 in reversed(range(0, n, w)):
+        k1 = min(k0 + w, n)
+        U = np.asarray(LU[:k1, k0:k1])
+        solve_triangular(U[k0:], x2[k0:k1], lower=False, overwrite_b=True)
+        x2[:k0] -= U[:k0] @ x2[k0:k1]
+    return x
+
+
+def _panel_size(n, dtype, memory):
+    # the loaded panel and one previous panel are kept in memory
+    w = int(memory // (2 * max(n, 1) * np.dtype(dtype).itemsize))
+    assert w >= 1, 'memory is too small for a single column'
+    return min(w, n)
@@ -0,0 +1,158 @@
+import numpy as np
+
+
+def qr(A, mode='reduced', block_size=32):
+    '''
+    QR decompostion by Householder reflections
+
+    Input Params
+    ------------
+    A .............. matrix (m x n)
+    mode ........... form of the result
+            reduced .... Q (m x k), R (k x n), k = min(m, n)
+            complete ... Q (m x m), R (m x n)
+            r .......... only R (k x n)
+            compact .... QR, tau from qr_factor (Q is not formed)
+    block_size ..... number of reflectors applied together
+
+    Output Params
+    -------------
+    Q .............. matrix with orthonormal columns
+    R .............. upper triangular (trapezoidal) matrix
+    '''
+    QR, tau = qr_factor(A, block_size=block_size)
+    m, n = QR.shape
+    k = min(m, n)
+    if mode == 'compact':
+        return QR, tau
+    if mode == 'r':
+        return np.triu(QR[:k])
+    if mode == 'complete':
+        Q = apply_q(QR, tau, np.eye(m, dtype=QR.dtype), block_size=block_size)
+        return Q, np.triu(QR)
+    assert mode == 'reduced'
+    Q = apply_q(QR, tau, np.eye(m, k, dtype=QR.dtype), block_size=block_size)
+    return Q, np.triu(QR[:k])
+
+
+def qr_factor(A, block_size=32, overwrite_a=False):
+    '''
+    Blocked Householder QR factorization with compact reflector storage
+
+    Reflectors H_j = I - tau_j v_j v_j^T are stored below the diagonal
+    (v_j[j] = 1 is implicit), Q = H_0 H_1 ... H_{k-1}. Reflectors of
+    one panel are applied to the trailing columns together in the compact
+    WY form I - V T V^T.
+
+    Input Params
+    ------------
+    A .............. matrix (m x n)
+    block_size ..... number of columns factored per panel
+    overwrite_a .... factor A in place if it is a floating point array
+
+    Output Params
+    -------------
+    QR ............. R in the upper triangle, reflectors below the diagonal
+    tau ............ scalar factors of the reflectors
+    '''
+    if overwrite_a and isinstance(A, np.ndarray) and np.issubdtype(A.dtype, np.floating):
+        QR = A
+    else:
+        A = np.asarray(A)
+        dtype = A.dtype if np.issubdtype(A.dtype, np.floating) else np.float64
+        QR = np.array(A, dtype=dtype)
+    m, n = QR.shape
+    k = min(m, n)
+    tau = np.zeros(k, dtype=QR.dtype)
+    for j0 in range(0, k, block_size):
+        j1 = min(j0 + block_size, k)
+        for j in range(j0, j1):
+            tau[j] = householder(QR[j:, j])
+            if tau[j] != 0 and j + 1 < j1:
+                v = np.concatenate(([1], QR[j+1:, j]))
+                C = QR[j:, j+1:j1]
+                C -= tau[j] * np.outer(v, v @ C)
+        if j1 < n:
+            V = _reflectors(QR, j0, j1)
+            T = _block_factor(V, tau[j0:j1])
+            C = QR[j0:, j1:]
+            C -= V @ (T.T @ (V.T @ C))
+    return QR, tau
+
+
+def apply_q(QR, tau, B, trans=False, side='left', block_size=32):
+    '''
+    Multiply by Q from qr_factor without forming Q
+
+    Input Params
+    ------------
+    QR ............. compact factor from qr_factor
+    tau ............ scalar factors of the reflectors
+    B .............. vector or matrix
+    trans .......... multiply by Q^T instead of Q
+    side ........... left (Q B) or right (B Q)
+    block_size ..... number of reflectors applied together
+
+    Output Params
+    -------------
+    C .............. product Q B, Q^T B, B Q or B Q^T
+    '''
+    B = np.asarray(B)
+    C = B.astype(np.result_type(QR, B))
+    k = len(tau)
+    blocks = [(j0, min(j0 + block_size, k)) for j0 in range(0, k, block_size)]
+    if side == 'left':
+        C2 = C.reshape(C.shape[0], -1)
+        # Q^T = H_{k-1} ... H_0, applied to B starting with H_0
+        for j0, j1 in (blocks if trans else reversed(blocks)):
+            V = _reflectors(QR, j0, j1)
+            T = _block_factor(V, tau[j0:j1])
+            C2[j0:] -= V @ ((T.T if trans else T) @ (V.T @ C2[j0:]))
+    else:
+        assert side == 'right'
+        C2 = C.reshape(-1, C.shape[-1])
+        for j0, j1 in (reversed(blocks) if trans else blocks):
+            V = _reflectors(QR, j0, j1)
+            T = _block_factor(V, tau[j0:j1])
+            C2[:, j0:] -= ((C2[:, j0:] @ V) @ (T.T if trans else T)) @ V.T
+    return C
+
+
+def householder(x):
+    '''
+    Householder reflector H = I - tau v v^T with H x = (beta, 0, ..., 0), as LAPACK dlarfg
+
+    Input Params
+    ------------
+    x .............. vector, overwritten with (beta, v[1:]), v[0] = 1 is not stored
+
+    Output Params
+    -------------
+    tau ............ scalar factor of the reflector (0 if x[1:] is zero, H = I)
+    '''
+    alpha = x[0]
+    xnorm = np.linalg.norm(x[1:])
+    if xnorm == 0:
+        return 0
+    beta = -np.copysign(np.hypot(alpha, xnorm), alpha)
+    x[1:] /= alpha - beta
+    x[0] = beta
+    return (beta - alpha) / beta
+
+
+def _reflectors(QR, j0, j1):
+    V = np.tril(QR[j0:, j0:j1], -1)
+    V[np.arange(j1 - j0), np.arange(j1 - j0)] = 1
+    return V
+
+
+def _block_factor(V, tau):
+    # upper triangular T with H_0 ... H_{b-1} = I - V T V^T
+    b = len(tau)
+    G = V.T @ V
+    T = np.zeros((b, b), dtype=V.dtype)
+    for i in range(b):
+        T[i, i] = tau[i]
+        if i > 0:
+            T[:i, i] = -tau[i] * (T[:i, :i] @ G[:i, i])
+    return T
@@ -0,0 +1,206 @@
+import heapq
+import os
+import threading
+
+import numpy as np
+from .cholesky import cholesky
+from .lu import lu_factor, _as_float_array
+from .triangular import solve_triangular
+
+
+def lu_factor_tiled(A, tile_size=256, workers=None, overwrite_a=False):
+    '''
+    Tiled LU factorization with partial pivoting on a pool of threads
+
+    Every step k is a panel factorization of the k-th block column,
+    row interchanges and triangular solves of the block columns right of it
+    and tile updates A_ij -= L_ik U_kj of the trailing matrix. The tasks run
+    as soon as the tiles they read are ready (see run_task_graph), so the
+    next panel overlaps with the updates of the current step. NumPy
+    releases the GIL in the matrix products; the BLAS should then run
+    single-threaded (e.g. OPENBLAS_NUM_THREADS=1).
+
+    Input Params
+    ------------
+    A .............. square matrix
+    tile_size ...... number of rows and columns of a tile
+    workers ........ number of threads, None for os.cpu_count()
+    overwrite_a .... factor A in place if it is a floating point array
+
+    Output Params
+    -------------
+    LU ............. compact factor, strictly lower part of L and upper part of U
+    piv ............ pivoting indices, A[piv] = L @ U
+    '''
+    if overwrite_a and isinstance(A, np.ndarray) and np.issubdtype(A.dtype, np.inexact):
+        LU = A
+    else:
+        LU = _as_float_array(A)
+    assert len(LU.shape) == 2 and LU.shape[0] == LU.shape[1]
+    n = LU.shape[0]
+    bounds = [(t, min(t + tile_size, n)) for t in range(0, n, tile_size)]
+    nt = len(bounds)
+    perms = [None] * nt
+
+    def panel(k):
+        k0, k1 = bounds[k]
+        _, p = lu_factor(LU[k0:, k0:k1], pivoting=True, overwrite_a=True)
+        # only rows that moved (at most 2 tile_size) are copied
+        rows = np.flatnonzero(p != np.arange(len(p)))
+        perms[k] = (k0 + rows, k0 + p[rows])
+
+    def trsm(k, j):
+        (k0, k1), (j0, j1) = bounds[k], bounds[j]
+        dst, src = perms[k]
+        LU[dst, j0:j1] = LU[src, j0:j1]
+        solve_triangular(LU[k0:k1, k0:k1], LU[k0:k1, j0:j1], lower=True,
+                         unit_diagonal=True, overwrite_b=True)
+
+    def update(k, i, j):
+        (k0, k1), (i0, i1), (j0, j1) = bounds[k], bounds[i], bounds[j]
+        LU[i0:i1, j0:j1] -= LU[i0:i1, k0:k1] @ LU[k0:k1, j0:j1]
+
+    # keys (column, step, row) of the written tile, smaller columns first
+    tasks = {}
+    for k in range(nt):
+        tasks[k, k, k] = (lambda k=k: panel(k), [(k, k - 1, i) for i in range(k, nt) if k > 0])
+        for j in range(k + 1, nt):
+            deps = [(k, k, k)] + [(j, k - 1, i) for i in range(k, nt) if k > 0]
+            tasks[j, k, k] = (lambda k=k, j=j: trsm(k, j), deps)
+            for i in range(k + 1, nt):
+                # updates of one tile run in the order of the steps
+                deps = [(k, k, k), (j, k, k)] + ([(j, k - 1, i)] if k > 0 else [])
+                tasks[j, k, i] = (lambda k=k, i=i, j=j: update(k, i, j), deps)
+    run_task_graph(tasks, workers)
+
+    # interchanges of the later panels applied to the columns of L
+    def swap_left(k):
+        k0, k1 = bounds[k]
+        for dst, src in perms[k+1:]:
+            LU[dst, k0:k1] = LU[src, k0:k1]
+
+    run_task_graph({k: (lambda k=k: swap_left(k), []) for k in range(nt - 1)}, workers)
+    piv = np.arange(n)
+    for dst, src in perms:
+        piv[dst] = piv[src]
+    return LU, piv
+
+
+def cholesky_tiled(A, tile_size=256, workers=None):
+    '''
+    Tiled Cholesky decomposition on a pool of threads
+
+    Every step k factors the diagonal tile, solves the tiles below it and
+    updates the trailing lower triangle tile by tile, the tasks run as
+    soon as their tiles are ready (see lu_factor_tiled).
+
+    Input Params
+    ------------
+    A .............. symmetric positive definite matrix (only the lower triangle is read)
+    tile_size ...... number of rows and columns of a tile
+    workers ........ number of threads, None for os.cpu_count()
+
+    Output Params
+    -------------
+    L .............. lower triangular matrix, A = L @ L.T
+    '''
+    A = np.asarray(A)
+    assert len(A.shape) == 2 and A.shape[0] == A.shape[1]
+    dtype = A.dtype if np.issubdtype(A.dtype, np.floating) else np.float64
+    L = np.array(A, dtype=dtype, order='C')
+    n = L.shape[0]
+    bounds = [(t, min(t + tile_size, n)) for t in range(0, n, tile_size)]
+    nt = len(bounds)
+
+    def potrf(k):
+        k0, k1 = bounds[k]
+        L[k0:k1, k0:k1] = cholesky(L[k0:k1, k0:k1], block_size=tile_size)
+
+    def trsm(k, i):
+        (k0, k1), (i0, i1) = bounds[k], bounds[i]
+        solve_triangular(L[k0:k1, k0:k1], L[i0:i1, k0:k1].T, lower=True, overwrite_b=True)
+
+    def update(k, i, j):
+        (k0, k1), (i0, i1), (j0, j1) = bounds[k], bounds[i], bounds[j]
+        L[i0:i1, j0:j1] -= L[i0:i1, k0:k1] @ L[j0:j1, k0:k1].T
+
+    # keys (column, step, row) of the written tile, smaller columns first
+    tasks = {}
+    for k in range(nt):
+        tasks[k, k, k] = (lambda k=k: potrf(k), [(k, k - 1, k)] if k > 0 else [])
+        for i in range(k + 1, nt):
+            deps = [(k, k, k)] + ([(k, k - 1, i)] if k > 0 else [])
+            tasks[k, k, i] = (lambda k=k, i=i: trsm(k, i), deps)
+        for j in range(k + 1, nt):
+            for i in range(j, nt):
+                # updates of one tile run in the order of the steps, so the
+                # last one (j, j - 1, i) finishes after all of them
+                deps = [(k, k, i), (k, k, j)] + ([(j, k - 1, i)] if k > 0 else [])
+                tasks[j, k, i] = (lambda k=k, i=i, j=j: update(k, i, j), deps)
+    run_task_graph(tasks, workers)
+    return np.tril(L)
+
+
+def run_task_graph(tasks, workers=None):
+    '''
+    Run tasks with dependencies on a pool of threads
+
+    A task starts as soon as all its dependencies have finished, of the
+    ready tasks the one with the smallest key goes first. The calling
+    thread is one of the workers. The first exception raised by a task
+    stops the scheduling and is raised again.
+
+    Input Params
+    ------------
+    tasks .......... dict key -> (function without arguments, keys of its dependencies),
+                     keys must be comparable (e.g. tuples of ints)
+    workers ........ number of threads, None for os.cpu_count()
+    '''
+    workers = workers or os.cpu_count() or 1
+    waiting = {key: len(deps) for key, (_, deps) in tasks.items()}
+    successors = {key: [] for key in tasks}
+    for key, (_, deps) in tasks.items():
+        for dep in deps:
+            successors[dep].append(key)
+    ready = [key for key, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+    state = {'remaining': len(tasks), 'running': 0, 'error': None}
+    lock = threading.Condition()
+
+    def work():
+        while True:
+            with lock:
+                while not ready and state['remaining'] and state['running'] and state['error'] is None:
+                    lock.wait()
+                if state['error'] is not None or not state['remaining']:
+                    return
+                if not ready:
+                    state['error'] = ValueError('tasks have cyclic dependencies')
+                    lock.notify_all()
+                    return
+                key = heapq.heappop(ready)
+                state['running'] += 1
+            try:
+                tasks[key][0]()
+            except BaseException as e:
+                with lock:
+                    state['error'] = e
+                    lock.notify_all()
+                return
+            with lock:
+                state['running'] -= 1
+                state['remaining'] -= 1
+                for succ in successors[key]:
+                    waiting[succ] -= 1
+                    if waiting[succ] == 0:
+                        heapq.heappush(ready, succ)
+                lock.notify_all()
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(min(workers, len(tasks)) - 1)]
+    for t in threads:
+        t.start()
+    work()
+    for t in threads:
+        t.join()
+    if state['error'] is not None:
+        raise state['error']
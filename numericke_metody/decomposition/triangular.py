@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def solve_triangular(T, B, lower=True, unit_diagonal=False, trans=False, block_size=64, overwrite_b=False):
+    '''
+    Solve triangular system T X = B (or T^T X = B) by blocked substitution
+
+    Only the relevant triangle of T is read, so T may hold another factor
+    in its opposite triangle (e.g. a compact LU array).
+
+    Input Params
+    ------------
+    T .............. square matrix
+    B .............. right-hand side vector or matrix (n x k)
+    lower .......... use the lower triangle of T
+    unit_diagonal .. assume ones on the diagonal of T
+    trans .......... solve with the transpose of T
+    block_size ..... number of rows substituted between matrix products
+    overwrite_b .... allow overwriting B with the solution
+
+    Output Params
+    -------------
+    X .............. solution of the same shape as B
+    '''
+    T = np.asarray(T)
+    B = np.asarray(B)
+    n = T.shape[0]
+    dtype = np.result_type(T, B, np.float32)
+    if overwrite_b and B.dtype == dtype:
+        X = B
+    else:
+        X = B.astype(dtype)
+    if n == 0:
+        return X
+    X2 = X.reshape(n, -1)
+    if trans:
+        T = T.T
+        lower = not lower
+    if lower:
+        starts = range(0, n, block_size)
+    else:
+        starts = reversed(range(0, n, block_size))
+    for i0 in starts:
+        i1 = min(i0 + block_size, n)
+        if lower and i0 > 0:
+            X2[i0:i1] -= T[i0:i1, :i0] @ X2[:i0]
+        elif not lower and i1 < n:
+            X2[i0:i1] -= T[i0:i1, i1:] @ X2[i1:]
+        rows = range(i0, i1) if lower else reversed(range(i0, i1))
+        for i in rows:
+            if lower and i > i0:
+                X2[i] -= T[i, i0:i] @ X2[i0:i]
+            elif not lower and i < i1 - 1:
+                X2[i] -= T[i, i+1:i1] @ X2[i+1:i1]
+            if not unit_diagonal:
+                X2[i] /= T[i, i]
+    return X
@@ -1,2 +1,5 @@
 from .utils import *
 from .eigenvals import *
+from .hessenberg import *
+from .krylov import *
+from .shift_invert import *
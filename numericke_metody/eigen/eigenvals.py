@@ -1,10 +1,15 @@
+import math
 from time import sleep
 from IPython.display import clear_output
 
 import numpy as np
 from numericke_metody.decomposition import lu as lu_factorization
+from numericke_metody.decomposition import qr_factor, apply_q
 from .utils import is_upper_triag
 
+__all__ = ['lr_transform', 'qr_transform', 'rotate', 'jacobi', 'jacobi_max', 'jacobi_cyclic',
+           'power_iteration', 'rayleigh']
+
 
 def lr_transform(A, max_iter = 25, progress = 0):
     '''
@@ -61,8 +66,8 @@ def qr_transform(A, max_iter = 25, progress = 0):
     A = A.astype(np.float64)
     k = 0
     while not(is_upper_triag(A)) and k < max_iter:
-        Q, R = np.linalg.qr(A, mode='complete')
-        A = R @ Q
+        QR, tau = qr_factor(A)
+        A = apply_q(QR, tau, np.triu(QR), side='right')
         if progress:
             clear_output(wait=True)
             with np.printoptions(precision=6, suppress=True):
@@ -77,41 +82,35 @@ def qr_transform(A, max_iter = 25, progress = 0):
         
     
 
-def rotate(A, p, q):
+def rotate(A, p, q, overwrite_a=False):
     '''
     Zeroes matrix element at given position using Givens rotation
     
     Input params
     -----------------
-    A ... square numpy array
-    p ... row index
-    q ... column index
+    A ............. square numpy array
+    p ............. row index
+    q ............. column index
+    overwrite_a ... rotate A in place if it is a float64 array
     
     Output params
     ----------------------------
     Matrix (numpy array) B with zeroed element
     '''
-    A = A.astype(np.float64)
-    B = np.copy(A)
-    r = np.sqrt((A[p,p] - A[q,q])**2 + 4*A[p,q]**2)
-    
-    if A[p,q] < 0:
-        si = -1
+    if overwrite_a and isinstance(A, np.ndarray) and A.dtype == np.float64:
+        B = A
     else:
-        si = 1
-        
-    c = np.sqrt(.5 + (A[p,p] - A[q, q]) / (2*r))
-    s = si * np.sqrt(.5 - (A[p,p] - A[q, q]) / (2*r))
-    
-    bpp = (A[p,p] + A[q,q] + r) / 2
-    bqq = (A[p,p] * A[q,q] - A[p,q] * A[p,q]) / bpp
+        B = A.astype(np.float64)
+    app, aqq, apq = float(B[p,p]), float(B[q,q]), float(B[p,q])
+    if apq == 0:
+        return B
+    c, s, bpp, bqq = _rotation(app, aqq, apq)
     
-    for i in range(len(A)):
-        if (i != p) and (i != q):
-            bip = A[i,p] * c + A[i,q] * s
-            biq = -A[i,p] * s + A[i,q] * c
-            B[i,p] = B[p,i] = bip
-            B[i,q] = B[q,i] = biq
+    # rows p, q and columns p, q at once, A is symmetric
+    bp = B[:, p] * c + B[:, q] * s
+    bq = -B[:, p] * s + B[:, q] * c
+    B[:, p] = B[p, :] = bp
+    B[:, q] = B[q, :] = bq
     
     B[p,p] = bpp
     B[q,q] = bqq
@@ -142,7 +141,8 @@ def jacobi(A, eps=1e-5, max_iter=25, progress=0):
     m, n = np.shape(A)
     if (m == n) and (np.linalg.norm(A-A.T) < 1e-5):
         k = 0
-        err = 10000
+        err2 = np.sum(np.tril(A, -1)**2)
+        err = np.sqrt(err2)
         i = 0
         j = 1
         
@@ -150,13 +150,24 @@ def jacobi(A, eps=1e-5, max_iter=25, progress=0):
             if i == n-1:
                 i = 0
                 j = 1
+                # the running sum is recomputed once per sweep
+                err2 = np.sum(np.tril(A, -1)**2)
+                err = np.sqrt(err2)
+                if err <= eps:
+                    break
             #i += 1
             #j = i + 1
 
 
             while (err > eps) and (k < max_iter) and (j < n):
-                A = rotate(A, i, j)
-                err = np.linalg.norm(np.tril(A, -1))
+                # a rotation moves A[j, i]^2 from the lower triangle to the diagonal
+                err2 = err2 - A[j, i]**2
+                A = rotate(A, i, j, overwrite_a=True)
+                err = np.sqrt(max(err2, 0))
+                if err <= eps:
+                    # the running sum is checked once it reaches the tolerance
+                    err2 = np.sum(np.tril(A, -1)**2)
+                    err = np.sqrt(err2)
                 k += 1
                 j += 1
                 if progress:
@@ -200,14 +211,39 @@ def jacobi_max(A, eps=1e-5, max_iter=25, progress=0):
     m, n = np.shape(A)
     if (m == n) and (np.linalg.norm(A-A.T) < 1e-5):
         k = 0
-        err = 10000
+        err2 = np.sum(np.tril(A, -1)**2)
+        err = np.sqrt(err2)
+        maxima = _RowMaxima(A)
         
         while (err > eps) and (k < max_iter):
-            i, j = np.unravel_index(np.argmax(np.abs(np.triu(A, 1))), A.shape)
-            
-            A = rotate(A, i, j)
-            err = np.linalg.norm(np.tril(A, -1))
+            i, j = maxima.pivot()
+            app, aqq, apq = float(A[i, i]), float(A[j, j]), float(A[i, j])
+            if apq == 0:
+                # the largest element is zero, A is diagonal
+                break
+
+            # rotation of rows and columns i, j in place, as in rotate
+            c, s, bpp, bqq = _rotation(app, aqq, apq)
+            ri, rj = A[i], A[j]
+            bp = ri * c + rj * s
+            bq = rj * c - ri * s
+            ri[:] = bp
+            rj[:] = bq
+            A[:, i] = bp
+            A[:, j] = bq
+            A[i, i], A[j, j] = bpp, bqq
+            A[i, j] = A[j, i] = 0
+            maxima.update(i, j)
+
+            # a rotation moves A[j, i]^2 from the lower triangle to the diagonal
+            err2 -= apq * apq
+            err = math.sqrt(max(err2, 0))
             k += 1
+            if err <= eps or k % (n * n) == 0:
+                # the running sum is checked once it reaches the tolerance
+                # and recomputed every n^2 rotations
+                err2 = np.sum(np.tril(A, -1)**2)
+                err = np.sqrt(err2)
             
             if progress:
                 clear_output(wait=True)
@@ -223,6 +259,168 @@ def jacobi_max(A, eps=1e-5, max_iter=25, progress=0):
     return np.diagonal(A)
 
 
+def _rotation(app, aqq, apq):
+    # rotation A[:, p] <- c A[:, p] + s A[:, q], A[:, q] <- -s A[:, p] + c A[:, q]
+    # zeroing apq != 0 with c >= 0 and the larger new diagonal element bpp at p,
+    # the tangent form (Golub, Van Loan 8.5.2) has no cancellation
+    theta = (aqq - app) / (2 * apq)
+    t = math.copysign(1, theta) / (abs(theta) + math.hypot(1, theta))
+    c = 1 / math.sqrt(1 + t * t)
+    s = t * c
+    bpp, bqq = app - t * apq, aqq + t * apq
+    if bpp >= bqq:
+        return c, -s, bpp, bqq
+    # a further quarter turn swaps the new rows, the sign keeps c >= 0
+    sign = math.copysign(1, s)
+    return sign * s, sign * c, bqq, bpp
+
+
+class _RowMaxima:
+    '''
+    Largest elements |A[r, c]|, c > r of every row of a symmetric matrix
+
+    A rotation in rows and columns p, q changes only these two rows and
+    columns, so rows p, q are searched again and the other rows compare
+    their maxima with the two new elements. A maximum that the rotation
+    decreased is found out only when its row is picked as the pivot, the
+    row is then searched again.
+    '''
+
+    def __init__(self, A):
+        self.A = A
+        n = A.shape[0]
+        U = np.abs(A)
+        U[np.tri(n, dtype=bool)] = -1
+        self.col = U.argmax(axis=1)
+        self.val = U[np.arange(n), self.col]
+
+    def scan(self, r):
+        # full search of row r
+        row = np.abs(self.A[r, r+1:])
+        c = row.argmax()
+        self.col[r] = r + 1 + c
+        self.val[r] = row[c]
+
+    def pivot(self):
+        # position (i, j), i < j of the largest off-diagonal element
+        while True:
+            i = self.val.argmax()
+            j = self.col[i]
+            if abs(self.A[i, j]) == self.val[i]:
+                return i, j
+            self.scan(i)
+
+    def update(self, p, q):
+        # p < q, column c above the diagonal is row c left of it, rows
+        # above p compare both new elements, rows p..q-1 the one in column q
+        new = np.abs(self.A[q, :q])
+        col = np.full(q, q)
+        new_p = np.abs(self.A[p, :p])
+        take_p = new_p > new[:p]
+        new[:p][take_p] = new_p[take_p]
+        col[:p][take_p] = p
+        better = new > self.val[:q]
+        self.val[:q][better] = new[better]
+        self.col[:q][better] = col[better]
+        self.scan(p)
+        if q < len(self.val) - 1:
+            self.scan(q)
+
+
+def jacobi_cyclic(A, eps=1e-12, max_sweeps=30, ordering='parallel', calc_v=False):
+    '''
+    Finds eigenvalues (and eigenvectors) of symmetric matrix using cyclic
+    Jacobi diagonalization with threshold.
+
+    A sweep rotates every off-diagonal pair once, pairs smaller than the
+    root mean square of the off-diagonal elements are skipped. Rotations
+    update rows and columns in place and the off-diagonal norm is tracked
+    from the zeroed elements. The parallel (Brent-Luk) ordering splits the
+    sweep into n - 1 rounds of n / 2 disjoint pairs, the rotations of a
+    round are applied together.
+
+    Input params
+    -----------------
+    A ............ symmetric numpy array
+    eps .......... relative tolerance of the off-diagonal norm (to the norm of A)
+    max_sweeps ... maximum number of sweeps
+    ordering ..... order of the pairs
+            cyclic ..... row by row, one rotation at a time
+            parallel ... Brent-Luk rounds of disjoint pairs
+    calc_v ....... return also the eigenvectors
+
+    Output params
+    ----------------------------
+    Vector (numpy array) of matrix A eigenvalues (in the order of the diagonal)
+    Matrix (numpy array) of eigenvectors in columns (only if calc_v)
+    '''
+    assert ordering in ('cyclic', 'parallel')
+    A = np.array(A, dtype=np.float64)
+    n = A.shape[0]
+    assert A.shape == (n, n) and np.allclose(A, A.T)
+    V = np.eye(n) if calc_v else None
+    tol2 = (eps * np.linalg.norm(A))**2
+    if ordering == 'parallel':
+        rounds = _brent_luk_rounds(n)
+    else:
+        rounds = [(p, q) for p in range(n - 1) for q in range(p + 1, n)]
+    for _ in range(max_sweeps + 1):
+        # sum of squares of the off-diagonal elements (both triangles), computed
+        # once per sweep and decreased by every rotation during the sweep
+        off2 = 2 * np.sum(np.triu(A, 1)**2)
+        if off2 <= tol2:
+            break
+        threshold = np.sqrt(off2 / max(n * (n - 1), 1))
+        for P, Q in rounds:
+            apq = A[P, Q]
+            big = (np.abs(apq) >= threshold) & (apq != 0)
+            if ordering == 'parallel':
+                off2 -= 2 * np.sum(apq[big]**2)
+                _jacobi_rotate(A, V, P[big], Q[big])
+            elif big:
+                off2 -= 2 * apq**2
+                _jacobi_rotate(A, V, P, Q)
+            if off2 <= tol2:
+                break
+    else:
+        raise ArithmeticError(f'Jacobi method did not converge in {max_sweeps} sweeps')
+    if calc_v:
+        return np.diagonal(A).copy(), V
+    return np.diagonal(A).copy()
+
+
+def _jacobi_rotate(A, V, P, Q):
+    # zeroes A[P, Q] by disjoint rotations A <- J^T A J, V <- V J (Golub, Van Loan 8.5.2),
+    # P and Q are index arrays or a single pair of ints
+    if np.size(P) == 0:
+        return
+    app, aqq, apq = A[P, P], A[Q, Q], A[P, Q]
+    theta = (aqq - app) / (2 * apq)
+    t = np.where(theta >= 0, 1, -1) / (np.abs(theta) + np.sqrt(1 + theta**2))
+    c = 1 / np.sqrt(1 + t**2)
+    s = t * c
+    for M in (A, V) if V is not None else (A,):
+        Mp, Mq = M[:, P], M[:, Q]
+        M[:, P], M[:, Q] = c * Mp - s * Mq, s * Mp + c * Mq
+    Ap, Aq = A[P], A[Q]
+    A[P], A[Q] = c[..., None] * Ap - s[..., None] * Aq, s[..., None] * Ap + c[..., None] * Aq
+    A[P, P], A[Q, Q] = app - t * apq, aqq + t * apq
+    A[P, Q] = A[Q, P] = 0
+
+
+def _brent_luk_rounds(n):
+    # n - 1 rounds of disjoint pairs covering all pairs, an index past the end
+    # stands for the missing player of odd n
+    m = n + n % 2
+    top, bottom = list(range(0, m, 2)), list(range(1, m, 2))
+    rounds = []
+    for _ in range(m - 1):
+        pairs = [(min(p, q), max(p, q)) for p, q in zip(top, bottom) if max(p, q) < n]
+        rounds.append((np.array([p for p, _ in pairs], dtype=int), np.array([q for _, q in pairs], dtype=int)))
+        top, bottom = [top[0], bottom[0]] + top[1:-1], bottom[1:] + [top[-1]]
+    return rounds
+
+
 def power_iteration(A, y0, eps = 1e-3, max_iter = 25, norm = False, progress=0):
     '''
     Finds principal eigenvalue of square symetric matrix using power iteration method.
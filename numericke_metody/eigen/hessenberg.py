@@ -0,0 +1,339 @@
+import functools
+import math
+
+import numpy as np
+from numericke_metody.decomposition import householder
+
+__all__ = ['hessenberg', 'hessenberg_qr']
+
+
+def hessenberg(A, calc_q=False, block_size=32):
+    '''
+    Reduces square matrix to upper Hessenberg form by Householder reflections,
+    A = Q @ H @ Q.T (symmetric matrix gives a tridiagonal H)
+
+    The reflectors of block_size columns are accumulated as I - V T V^T
+    and applied to the rest of the matrix by matrix products (LAPACK dgehrd).
+
+    Input params
+    -----------------
+    A .......... square numpy array
+    calc_q ..... return also the orthogonal matrix Q
+    block_size . number of columns reduced before the trailing update
+
+    Output params
+    ----------------------------
+    H .......... upper Hessenberg matrix
+    Q .......... orthogonal matrix (only if calc_q)
+    '''
+    H = np.array(A, dtype=np.float64)
+    n = H.shape[0]
+    assert H.shape == (n, n)
+    Q = np.eye(n) if calc_q else None
+    for k0 in range(0, n - 2, block_size):
+        k1 = min(k0 + block_size, n - 2)
+        nb = k1 - k0
+        # Y = A V T with A from the start of the block, so that A Q = A - Y V^T
+        V, Y, T = np.zeros((n, nb)), np.zeros((n, nb)), np.zeros((nb, nb))
+        for j in range(nb):
+            c = k0 + j
+            if j > 0:
+                # column c transformed by the previous reflectors of the block
+                H[:, c] -= Y[:, :j] @ V[c, :j]
+                b = H[k0+1:, c]
+                b -= V[k0+1:, :j] @ (T[:j, :j].T @ (V[k0+1:, :j].T @ b))
+            v = np.copy(H[c+1:, c])
+            tau = householder(v)
+            H[c+1, c], H[c+2:, c] = v[0], 0
+            v[0] = 1
+            V[c+1:, j] = v
+            g = V[c+1:, :j].T @ v
+            T[:j, j] = -tau * (T[:j, :j] @ g)
+            T[j, j] = tau
+            Y[:, j] = tau * (H[:, c+1:] @ v - Y[:, :j] @ g)
+        # right and left update of the columns right of the block
+        H[:, k1:] -= Y @ V[k1:].T
+        H[k0+1:, k1:] -= V[k0+1:] @ (T.T @ (V[k0+1:].T @ H[k0+1:, k1:]))
+        if calc_q:
+            Q[:, k0+1:] -= (Q[:, k0+1:] @ V[k0+1:]) @ T @ V[k0+1:].T
+    if calc_q:
+        return H, Q
+    return H
+
+
+def hessenberg_qr(A, max_iter=30, eps=np.finfo(np.float64).eps):
+    '''
+    Finds all eigenvalues of square matrix by the shifted QR algorithm
+
+    The matrix is reduced to Hessenberg form once (tridiagonal for symmetric
+    matrix), every QR step then costs O(n^2) (O(n) for tridiagonal). Symmetric
+    matrices use Wilkinson shifts, others Francis double shifts, which keep
+    the arithmetic real and give complex conjugate pairs from 2x2 blocks.
+    Converged eigenvalues are deflated off the bottom of the active block.
+
+    Input params
+    -----------------
+    A .......... square numpy array
+    max_iter ... maximum number of QR steps per eigenvalue
+    eps ........ relative tolerance of negligible subdiagonal elements
+
+    Output params
+    ----------------------------
+    Vector (numpy array) of matrix A eigenvalues, complex if some of them are
+    (conjugate pairs are adjacent)
+    '''
+    A = np.asarray(A, dtype=np.float64)
+    n = A.shape[0]
+    assert A.shape == (n, n)
+    if n == 0:
+        return np.zeros(0)
+    if np.max(np.abs(A - A.T)) <= 1e-12 * np.max(np.abs(A)):
+        d, e = _tridiagonalize(A)
+        return np.array(_tridiagonal_qr(d, e, max_iter, eps))
+    H = hessenberg(A)
+    return _francis_qr(H, max_iter, eps)
+
+
+def _tridiagonalize(A, block_size=32):
+    # Householder reduction of symmetric matrix (LAPACK dsytrd), the trailing
+    # block is A - V W^T - W V^T with the reflectors V of the current block
+    T = np.array(A, dtype=np.float64)
+    n = T.shape[0]
+    d, e = np.zeros(n), np.zeros(max(n - 1, 0))
+    for k0 in range(0, n, block_size):
+        k1 = min(k0 + block_size, n)
+        V, W = np.zeros((n, k1 - k0)), np.zeros((n, k1 - k0))
+        for j in range(k1 - k0):
+            k = k0 + j
+            a = T[k:, k] - V[k:, :j] @ W[k, :j] - W[k:, :j] @ V[k, :j]
+            d[k] = a[0]
+            if k == n - 1:
+                break
+            v = a[1:]
+            tau = householder(v)
+            e[k] = v[0]
+            if tau == 0:
+                continue
+            v[0] = 1
+            V[k+1:, j] = v
+            p = T[k+1:, k+1:] @ v - V[k+1:, :j] @ (W[k+1:, :j].T @ v) - W[k+1:, :j] @ (V[k+1:, :j].T @ v)
+            p *= tau
+            W[k+1:, j] = p - (tau / 2 * (p @ v)) * v
+        T[k1:, k1:] -= V[k1:] @ W[k1:].T + W[k1:] @ V[k1:].T
+    return d.tolist(), e.tolist()
+
+
+def _tridiagonal_qr(d, e, max_iter, eps):
+    # implicit symmetric QR steps with Wilkinson shift (Golub, Van Loan 8.3),
+    # d and e are lists of floats, e[k] couples k and k + 1
+    m = len(d) - 1
+    its = 0
+    while m > 0:
+        if abs(e[m-1]) <= eps * (abs(d[m-1]) + abs(d[m])):
+            m -= 1
+            its = 0
+            continue
+        l = m - 1
+        while l > 0 and abs(e[l-1]) > eps * (abs(d[l-1]) + abs(d[l])):
+            l -= 1
+        its += 1
+        if its > max_iter:
+            raise ArithmeticError(f'QR algorithm did not converge in {max_iter} iterations')
+        t = (d[m-1] - d[m]) / 2
+        mu = d[m] - e[m-1]**2 / (t + math.copysign(math.hypot(t, e[m-1]), t))
+        x, z = d[l] - mu, e[l]
+        for k in range(l, m):
+            r = math.hypot(x, z)
+            c, s = x / r, z / r
+            if k > l:
+                e[k-1] = r
+            dk, dk1, ek = d[k], d[k+1], e[k]
+            d[k] = c * c * dk + 2 * c * s * ek + s * s * dk1
+            d[k+1] = s * s * dk - 2 * c * s * ek + c * c * dk1
+            e[k] = c * s * (dk1 - dk) + (c * c - s * s) * ek
+            if k < m - 1:
+                x, z = e[k], s * e[k+1]
+                e[k+1] *= c
+    return d
+
+
+def _francis_qr(H, max_iter, eps, min_multishift=75, shifts=32, chunk=None):
+    # QR steps on the active block H[l:i+1, l:i+1], only the active block is
+    # updated as no Schur vectors are needed; large blocks chase a chain of
+    # bulges from several shifts at once (see _multishift_sweep)
+    n = H.shape[0]
+    # two zero rows and columns let the bulge views reach past the last row
+    H = np.pad(H, (0, 2))
+    eig = np.zeros(n, dtype=complex)
+    i = n - 1
+    its = 0
+    while i >= 0:
+        d = np.abs(np.diagonal(H)[:i+1])
+        sub = np.abs(np.diagonal(H, -1)[:i])
+        small = np.flatnonzero(sub <= eps * (d[:i] + d[1:]))
+        l = small[-1] + 1 if len(small) else 0
+        if l > 0:
+            H[l, l-1] = 0
+        if l == i:
+            eig[i] = H[i, i]
+            i -= 1
+            its = 0
+            continue
+        if l == i - 1:
+            eig[i-1], eig[i] = _eig2(H[i-1, i-1], H[i-1, i], H[i, i-1], H[i, i])
+            i -= 2
+            its = 0
+            continue
+        its += 1
+        if its > max_iter:
+            raise ArithmeticError(f'QR algorithm did not converge in {max_iter} iterations')
+        if its % 10 == 0:
+            # exceptional shift breaks cycles of the standard one
+            s = abs(H[i, i-1]) + abs(H[i-1, i-2])
+            h = 0.75 * s + H[i, i]
+            _francis_step(H, l, i, 2 * h, h * h + 0.4375 * s * s)
+        elif i - l + 1 >= min_multishift:
+            # eigenvalues of the trailing block are the shifts
+            ns = min(shifts, (i - l + 1) // 4)
+            try:
+                mu = _francis_qr(H[i-ns+1:i+1, i-ns+1:i+1], max_iter, eps, min_multishift, shifts)
+            except ArithmeticError:
+                mu = np.zeros(0)
+            _multishift_sweep(H, l, i, *_shift_pairs(mu), chunk=chunk)
+        else:
+            tr = H[i-1, i-1] + H[i, i]
+            det = H[i-1, i-1] * H[i, i] - H[i-1, i] * H[i, i-1]
+            _francis_step(H, l, i, tr, det)
+    if np.all(eig.imag == 0):
+        return eig.real
+    return eig
+
+
+def _shift_pairs(mu):
+    # traces and determinants of the quadratic factors of the shift polynomial,
+    # complex shifts come in adjacent conjugate pairs, real ones are paired in order
+    mu = np.atleast_1d(mu)
+    complex_mu = mu[np.iscomplex(mu) & (mu.imag > 0)]
+    real_mu = mu[~np.iscomplex(mu)].real
+    real_mu = real_mu[:len(real_mu) // 2 * 2]
+    tr = np.concatenate([2 * complex_mu.real, real_mu[0::2] + real_mu[1::2]])
+    det = np.concatenate([np.abs(complex_mu)**2, real_mu[0::2] * real_mu[1::2]])
+    return tr, det
+
+
+def _multishift_sweep(H, l, i, tr, det, chunk=None):
+    # chain of bulges 4 rows apart, one per quadratic factor (tr, det); the
+    # bulges touch disjoint rows and columns, so one step moves all of them
+    # down by one row with a few array operations (see _bulge_step). The
+    # steps run in chunks on a small diagonal window of H, their product U is
+    # applied to the rest of the rows and columns by two matrix products
+    nb = len(tr)
+    if nb == 0:
+        return
+    steps = (i - l) + 4 * (nb - 1)
+    chunk = chunk or max(4 * nb, 32)
+    for t0 in range(0, steps, chunk):
+        t1 = min(t0 + chunk, steps)
+        w0 = max(l, l + t0 - 4 * (nb - 1) - 1)
+        w1 = min(l + t1 + 3, i + 2)
+        w = w1 - w0
+        # two zero rows and columns let the bulge views reach past the window
+        W = np.zeros((w + 2, w + 2))
+        W[:w, :w] = H[w0:w1, w0:w1]
+        U = np.eye(w + 2)
+        for t in range(t0, t1):
+            _bulge_step(W, U, l - w0, i - w0, t, nb, tr, det)
+        H[w0:w1, w0:w1] = W[:w, :w]
+        H[w0:w1, w1:i+1] = U[:w, :w].T @ H[w0:w1, w1:i+1]
+        H[l:w0, w0:w1] = H[l:w0, w0:w1] @ U[:w, :w]
+
+
+def _bulge_step(W, U, l, i, t, nb, tr, det):
+    # step t of the chain in the window W (l and i relative to the window),
+    # bulge j is at row l + t - 4 j, it is active in rows l..i-1
+    jlo, jhi = max(0, -(-(t - (i - 1 - l)) // 4)), min(nb - 1, t // 4)
+    if jlo > jhi:
+        return
+    m = jhi - jlo + 1
+    p0, p1 = l + t - 4 * jhi, l + t - 4 * jlo
+    rows, cols, iv, ibv = _chain_indices(m)
+    X = W[p0 + rows, p0 + cols]
+    if p0 == l:
+        # new bulge from the first column of (H - s1 I)(H - s2 I)
+        h00, h01, h10, h11, h21 = W[l, l], W[l, l+1], W[l+1, l], W[l+1, l+1], W[l+2, l+1]
+        X[0] = (h00 * h00 + h01 * h10 - tr[jhi] * h00 + det[jhi],
+                h10 * (h00 + h11 - tr[jhi]), h10 * h21)
+    norm = np.sqrt(np.einsum('mj,mj->m', X, X))
+    V = np.copy(X)
+    V[:, 0] += np.copysign(norm, X[:, 0])
+    vv = np.einsum('mj,mj->m', V, V)
+    bV = V * (2 / np.where(vv > 0, vv, 1))[:, None]
+    n = W.shape[0] - 2
+    R = W[p0:p0+4*m].reshape(m, 4, -1)[:, :3, max(l, p0 - 1):n]
+    R -= bV[:, :, None] * np.einsum('mj,mjc->mc', V, R)[:, None, :]
+    # the reflected columns are exactly -+norm e_1 (the new bulge has none)
+    k = 1 if p0 == l else 0
+    X[:, 0], X[:, 1:] = -np.copysign(norm, X[:, 0]), 0
+    W[p0 + rows[k:], p0 + cols[k:]] = X[k:]
+    # the column updates are products with the block diagonal matrix of the
+    # reflectors (4 x 4 blocks, the fourth row and column are zero)
+    Vb, bVb = np.zeros(4 * m * m), np.zeros(4 * m * m)
+    Vb[iv], bVb[ibv] = V.ravel(), bV.ravel()
+    Vb, bVb = Vb.reshape(4 * m, m), bVb.reshape(m, 4 * m)
+    # below the chain H is zero, U is nonzero down to the row of the first bulge
+    for A, r1 in ((W, min(p1 + 4, n)), (U, min(l + t + 4, n))):
+        C = A[:r1, p0:p0+4*m]
+        C -= (C @ Vb) @ bVb
+
+
+@functools.lru_cache
+def _chain_indices(m):
+    # rows and columns of the bulges relative to the first one, flat indices
+    # of the blocks of reflectors in (4 m x m) and (m x 4 m) matrices
+    j, r = np.arange(m)[:, None], np.arange(3)
+    return 4 * j + r, 4 * j - 1, ((4 * j + r) * m + j).ravel(), (j * 4 * m + 4 * j + r).ravel()
+
+
+def _francis_step(H, l, i, tr, det):
+    # first column of (H - s1 I)(H - s2 I), then the bulge is chased down
+    h00, h01, h10, h11, h21 = H[l, l], H[l, l+1], H[l+1, l], H[l+1, l+1], H[l+2, l+1]
+    x = h00 * h00 + h01 * h10 - tr * h00 + det
+    y = h10 * (h00 + h11 - tr)
+    z = h10 * h21
+    for k in range(l, i - 1):
+        v, bv = _reflector(x, y, z)
+        if v is not None:
+            rows = H[k:k+3, max(l, k - 1):i+1]
+            rows -= bv[:, None] * (v @ rows)
+            if k > l:
+                H[k+1, k-1] = H[k+2, k-1] = 0
+            cols = H[l:min(k+4, i+1), k:k+3]
+            cols -= (cols @ v)[:, None] * bv
+        x, y, z = H[k+1:k+4, k].tolist()
+    v, bv = _reflector(x, y)
+    if v is not None:
+        rows = H[i-1:i+1, i-2:i+1]
+        rows -= bv[:, None] * (v @ rows)
+        H[i, i-2] = 0
+        cols = H[l:i+1, i-1:i+1]
+        cols -= (cols @ v)[:, None] * bv
+
+
+def _reflector(*x):
+    # v and beta v with (I - beta v v^T) x = -+||x|| e_1
+    norm = math.sqrt(sum(t * t for t in x))
+    if norm == 0:
+        return None, None
+    v = np.array(x)
+    v[0] += math.copysign(norm, x[0])
+    return v, v * (2 / (v @ v))
+
+
+def _eig2(a, b, c, d):
+    # eigenvalues of [[a, b], [c, d]], real ones computed without cancellation
+    p = (a + d) / 2
+    q = (a - d)**2 / 4 + b * c
+    if q < 0:
+        return complex(p, math.sqrt(-q)), complex(p, -math.sqrt(-q))
+    r = p + math.copysign(math.sqrt(q), p)
+    return r, (a * d - b * c) / r if r != 0 else 0.0
@@ -0,0 +1,161 @@
+import numpy as np
+from numericke_metody.decomposition import cholesky, qr, solve_triangular
+from numericke_metody.slae import aslinearoperator
+from .eigenvals import jacobi_cyclic
+
+__all__ = ['subspace_iteration', 'lanczos']
+
+
+def subspace_iteration(A, k, n=None, X0=None, block_size=None, eps=1e-8, max_iter=1000):
+    '''
+    Finds k eigenvalues of largest magnitude (and eigenvectors) of symmetric
+    matrix by block subspace iteration with Rayleigh-Ritz projection
+
+    Only products of A with n x block_size blocks are needed, one per
+    iteration, and four such blocks are stored.
+
+    Input params
+    -----------------
+    A ............ symmetric matrix (dense array, sparse.CSRMatrix,
+                   slae.LinearOperator or function X -> A X of n x p blocks)
+    k ............ number of eigenpairs
+    n ............ order of A, needed only when A is a function
+    X0 ........... initial block (n x block_size), random if None
+    block_size ... number of iterated vectors, min(n, 2 k) if None
+    eps .......... relative tolerance of the residuals ||A v - lambda v||
+                   (to the largest eigenvalue magnitude)
+    max_iter ..... maximum number of iterations
+
+    Output params
+    ----------------------------
+    Vector (numpy array) of k eigenvalues by decreasing magnitude
+    Matrix (numpy array, n x k) of eigenvectors in columns
+    '''
+    A = aslinearoperator(A, n)
+    n = A.shape[0]
+    p = block_size or min(n, 2 * k)
+    assert k <= p <= n
+    if X0 is None:
+        X0 = np.random.default_rng(0).standard_normal((n, p))
+    AX = A.matvec(_orthonormalize(np.asarray(X0, dtype=np.float64)))
+    for _ in range(max_iter):
+        # Rayleigh-Ritz on the span of A X
+        Q = _orthonormalize(AX)
+        AQ = A.matvec(Q)
+        theta, S = jacobi_cyclic((Q.T @ AQ + AQ.T @ Q) / 2, calc_v=True)
+        order = np.argsort(-np.abs(theta))
+        theta, S = theta[order], S[:, order]
+        X, AX = Q @ S, AQ @ S
+        res = np.linalg.norm(AX[:, :k] - X[:, :k] * theta[:k], axis=0)
+        if np.all(res <= eps * np.abs(theta[0])):
+            return theta[:k], X[:, :k]
+    raise ArithmeticError(f'Subspace iteration did not converge in {max_iter} iterations')
+
+
+def lanczos(A, k, n=None, v0=None, ncv=None, which='LA', eps=1e-10, max_restarts=1000):
+    '''
+    Finds k extreme eigenvalues (and eigenvectors) of symmetric matrix by
+    implicitly restarted Lanczos method
+
+    A Lanczos basis of ncv vectors (fully reorthogonalized) is compressed
+    to k vectors (a few more once some of them converge) by QR steps
+    on the tridiagonal matrix shifted by the unwanted Ritz values, then
+    it is extended again. Only products of A with vectors are needed and
+    ncv + 1 vectors of length n are stored.
+
+    Input params
+    -----------------
+    A ............ symmetric matrix (dense array, sparse.CSRMatrix,
+                   slae.LinearOperator or function x -> A x)
+    k ............ number of eigenpairs
+    n ............ order of A, needed only when A is a function
+    v0 ........... starting vector, random if None
+    ncv .......... number of basis vectors, min(n, max(2 k + 1, 20)) if None
+    which ........ wanted eigenvalues
+            LA ... largest algebraic
+            SA ... smallest algebraic
+            LM ... largest magnitude
+    eps .......... relative tolerance of the residuals ||A v - lambda v||
+                   (to the largest Ritz value magnitude)
+    max_restarts . maximum number of restarts
+
+    Output params
+    ----------------------------
+    Vector (numpy array) of k eigenvalues in the order given by which
+    Matrix (numpy array, n x k) of eigenvectors in columns
+    '''
+    assert which in ('LA', 'SA', 'LM')
+    A = aslinearoperator(A, n)
+    n = A.shape[0]
+    m = ncv or min(n, max(2 * k + 1, 20))
+    assert 0 < k < m <= n or k == m == n
+    rng = np.random.default_rng(0)
+    f = rng.standard_normal(n) if v0 is None else np.array(v0, dtype=np.float64)
+    V = np.zeros((n, m))
+    T = np.zeros((m, m))
+    j0 = 0
+    for _ in range(max_restarts):
+        f = _lanczos_extend(A, V, T, f, j0, rng)
+        beta = np.linalg.norm(f)
+        theta, S = jacobi_cyclic(T, calc_v=True)
+        key = {'LA': -theta, 'SA': theta, 'LM': -np.abs(theta)}[which]
+        order = np.argsort(key)
+        theta, S = theta[order], S[:, order]
+        # residual of the Ritz pair i is |beta s_{m,i}|
+        converged = np.abs(beta * S[m-1, :k]) <= eps * np.max(np.abs(theta))
+        if m == n or np.all(converged):
+            return theta[:k], V @ S[:, :k]
+        # implicit restart with the unwanted Ritz values as shifts, the basis
+        # keeps a few more vectors for the converged ones (as ARPACK dsaup2)
+        p = k + min(np.sum(converged), (m - k) // 2)
+        Q = np.eye(m)
+        for mu in theta[p:]:
+            Qj, R = qr(T - mu * np.eye(m))
+            T = R @ Qj + mu * np.eye(m)
+            Q = Q @ Qj
+        # T stays symmetric tridiagonal up to rounding
+        T = np.triu(np.tril((T + T.T) / 2, 1), -1)
+        f = V @ Q[:, p] * T[p, p-1] + f * Q[m-1, p-1]
+        V[:, :p] = V @ Q[:, :p]
+        T[p:], T[:, p:] = 0, 0
+        j0 = p
+    raise ArithmeticError(f'Lanczos method did not converge in {max_restarts} restarts')
+
+
+def _lanczos_extend(A, V, T, f, j0, rng):
+    # extends A V[:, :j0] = V[:, :j0] T[:j0, :j0] + f e^T to all columns of V,
+    # returns the new residual f
+    n, m = V.shape
+    for j in range(j0, m):
+        beta = np.linalg.norm(f)
+        if beta <= np.finfo(np.float64).eps * max(np.max(np.abs(T)), 1) * n:
+            # invariant subspace, the basis continues with a random vector
+            f = rng.standard_normal(n)
+            f -= V[:, :j] @ (V[:, :j].T @ f)
+            f -= V[:, :j] @ (V[:, :j].T @ f)
+            V[:, j] = f / np.linalg.norm(f)
+        else:
+            V[:, j] = f / beta
+            if j > 0:
+                T[j, j-1] = T[j-1, j] = beta
+        w = A.matvec(V[:, j])
+        # full reorthogonalization, twice is enough (Kahan, Parlett)
+        h = V[:, :j+1].T @ w
+        w = w - V[:, :j+1] @ h
+        h2 = V[:, :j+1].T @ w
+        w -= V[:, :j+1] @ h2
+        T[j, j] = h[j] + h2[j]
+        f = w
+    return f
+
+
+def _orthonormalize(X):
+    # orthonormal basis of the columns of tall X by Cholesky QR applied
+    # twice, Householder QR if X^T X is numerically singular
+    try:
+        for _ in range(2):
+            L = cholesky(X.T @ X)
+            X = X @ solve_triangular(L, np.eye(L.shape[0]), lower=True).T
+        return X
+    except np.linalg.LinAlgError:
+        return qr(X)[0]
@@ -0,0 +1,165 @@
+import numpy as np
+from numericke_metody.slae import LUFactorization
+from .eigenvals import jacobi_cyclic
+from .krylov import _orthonormalize
+
+__all__ = ['ShiftInvert', 'inverse_iteration', 'rayleigh_quotient_iteration']
+
+
+class ShiftInvert:
+    '''
+    Operator x -> (A - sigma I)^-1 x with cached LU factorization of A - sigma I
+
+    The factorization is computed again only when the shift moves, every
+    product costs two triangular solves. As an operator it gives lanczos
+    or subspace_iteration the eigenvalues of A near sigma,
+    lambda = sigma + 1 / theta for theta of the largest magnitude.
+
+    Input params
+    -----------------
+    A ............ square matrix
+    sigma ........ shift
+
+    Attributes
+    -----------------
+    A ............ the matrix (float64)
+    sigma ........ shift of the current factorization
+    norm_A ....... 1-norm of A
+    factorizations number of factorizations computed so far
+    '''
+
+    def __init__(self, A, sigma):
+        self.A = np.asarray(A, dtype=np.float64)
+        assert len(self.A.shape) == 2 and self.A.shape[0] == self.A.shape[1]
+        self.shape = self.A.shape
+        self.norm_A = np.max(np.sum(np.abs(self.A), axis=0)) if self.A.size else 0.0
+        self.sigma = None
+        self.factorizations = 0
+        self.set_shift(sigma)
+
+    def set_shift(self, sigma):
+        '''
+        Moves the shift, A - sigma I is factorized unless sigma is the current shift
+
+        Input params
+        -----------------
+        sigma ........ new shift
+
+        Output params
+        ----------------------------
+        True if A - sigma I was factorized again
+        '''
+        if sigma == self.sigma:
+            return False
+        n = self.shape[0]
+        self._F = LUFactorization(self.A - sigma * np.eye(n))
+        # sigma equal to an eigenvalue makes U exactly singular, a tiny pivot
+        # instead of the zero one makes the solves return its eigenvector
+        tiny = np.finfo(np.float64).eps * max(self.norm_A, np.finfo(np.float64).tiny)
+        self._F.perturb_zero_pivots(tiny)
+        self.sigma = sigma
+        self.factorizations += 1
+        return True
+
+    def matvec(self, x):
+        return self._F.solve(x)
+
+    def __matmul__(self, x):
+        return self._F.solve(x)
+
+
+def inverse_iteration(A, sigma, k=1, X0=None, block_size=None, eps=1e-10, max_iter=1000):
+    '''
+    Finds k eigenvalues (and eigenvectors) of symmetric matrix nearest to
+    the shift sigma by block inverse iteration with Rayleigh-Ritz projection
+
+    A - sigma I is factorized once, every iteration costs triangular solves
+    with an n x block_size block and one product of A with it.
+
+    Input params
+    -----------------
+    A ............ symmetric matrix or ShiftInvert of it (its factorization
+                   is reused, sigma is then ignored)
+    sigma ........ shift
+    k ............ number of eigenpairs
+    X0 ........... initial block (n x block_size), random if None
+    block_size ... number of iterated vectors, min(n, 2 k) if None
+    eps .......... relative tolerance of the residuals ||A v - lambda v||
+                   (to ||A||_1)
+    max_iter ..... maximum number of iterations
+
+    Output params
+    ----------------------------
+    Vector (numpy array) of k eigenvalues by increasing distance from sigma
+    Matrix (numpy array, n x k) of eigenvectors in columns
+    '''
+    F = A if isinstance(A, ShiftInvert) else ShiftInvert(A, sigma)
+    A, sigma = F.A, F.sigma
+    n = A.shape[0]
+    p = block_size or min(n, 2 * k)
+    assert k <= p <= n
+    if X0 is None:
+        X0 = np.random.default_rng(0).standard_normal((n, p))
+    X = np.asarray(X0, dtype=np.float64)
+    for _ in range(max_iter):
+        # Rayleigh-Ritz on the span of (A - sigma I)^-1 X
+        Q = _orthonormalize(F.matvec(X))
+        AQ = A @ Q
+        theta, S = jacobi_cyclic((Q.T @ AQ + AQ.T @ Q) / 2, calc_v=True)
+        order = np.argsort(np.abs(theta - sigma))
+        theta, S = theta[order], S[:, order]
+        X = Q @ S
+        res = np.linalg.norm(AQ @ S[:, :k] - X[:, :k] * theta[:k], axis=0)
+        if np.all(res <= eps * F.norm_A):
+            return theta[:k], X[:, :k]
+    raise ArithmeticError(f'Inverse iteration did not converge in {max_iter} iterations')
+
+
+def rayleigh_quotient_iteration(A, x0, sigma=None, eps=1e-12, max_iter=100, rate=0.1):
+    '''
+    Finds eigenvalue (and eigenvector) of symmetric matrix by Rayleigh
+    quotient iteration
+
+    Every iteration solves (A - rho I) y = x for the Rayleigh quotient rho
+    of x. The LU factorization of A - rho I is kept while the residual
+    drops at least rate times per iteration, the iteration then goes on
+    as inverse iteration with the old shift at the cost of two triangular
+    solves. rate = 0 is the classical method with a factorization per step.
+
+    Input params
+    -----------------
+    A ............ symmetric matrix or ShiftInvert of it (its factorization
+                   is used first, sigma is then ignored)
+    x0 ........... starting vector
+    sigma ........ first shift, the Rayleigh quotient of x0 if None
+    eps .......... relative tolerance of the residual ||A x - lambda x||
+                   (to ||A||_1)
+    max_iter ..... maximum number of iterations
+    rate ......... residual reduction per iteration that keeps the factorization
+
+    Output params
+    ----------------------------
+    Eigenvalue of A
+    Eigenvector (numpy array) of unit norm
+    '''
+    F = A if isinstance(A, ShiftInvert) else None
+    A = F.A if F else np.asarray(A, dtype=np.float64)
+    norm_A = np.max(np.sum(np.abs(A), axis=0))
+    x = np.array(x0, dtype=np.float64)
+    x /= np.linalg.norm(x)
+    res_old = np.inf
+    for _ in range(max_iter):
+        Ax = A @ x
+        rho = x @ Ax
+        res = np.linalg.norm(Ax - rho * x)
+        if res <= eps * norm_A:
+            return rho, x
+        if F is None:
+            F = ShiftInvert(A, rho if sigma is None else sigma)
+        elif res > rate * res_old:
+            # slow convergence, the shift moves to the Rayleigh quotient
+            F.set_shift(rho)
+        res_old = res
+        x = F.matvec(x)
+        x /= np.linalg.norm(x)
+    raise ArithmeticError(f'Rayleigh quotient iteration did not converge in {max_iter} iterations')
@@ -1,5 +1,16 @@
 from .gauss_seidel import gauss_seidel
 from .jacobi import jacobi
-from .sor import sor, compute_opt_omega
+from .sor import sor, compute_opt_omega, jacobi_spectral_radius, AdaptiveOmega
 from .gem import gaussian_elimination, gaussian_elimination_pivoting
-from .lu import lu
+from .lu import lu, LUFactorization, MixedLUFactorization, factorize
+from .cholesky import cholesky, ldlt, CholeskyFactorization
+from .qr import qr
+from .batched import lu_batched, lu_solve_batched
+from .operators import LinearOperator, aslinearoperator
+from .cg import cg, pcg
+from .krylov import gmres, bicgstab
+from .preconditioners import jacobi_preconditioner, ssor_preconditioner, ichol_preconditioner
+from .utils import print_progress, save_iterations, load_checkpoint
+from .multigrid import multigrid, multigrid_preconditioner, Multigrid, PoissonOperator
+from .service import SolverService
+from .banded import thomas, solve_banded, lu_solve_banded
@@ -0,0 +1,109 @@
+import numpy as np
+from numericke_metody.decomposition import lu_banded
+from numericke_metody.decomposition.banded import band_windows
+
+
+def thomas(a, b, c, d):
+    '''
+    Thomas algorithm for tridiagonal systems
+
+    Gaussian elimination without pivoting in O(n), stable for diagonally
+    dominant or symmetric positive definite matrices. Leading dimensions
+    are a stack of independent systems solved together.
+
+    Input Params
+    ------------
+    a .............. subdiagonal (... x n-1)
+    b .............. diagonal (... x n)
+    c .............. superdiagonal (... x n-1)
+    d .............. right-hand side (... x n or ... x n x k)
+
+    Output Params
+    -------------
+    x .............. solution of the same shape as d
+    '''
+    a, b, c, d = (np.asarray(v) for v in (a, b, c, d))
+    n = b.shape[-1]
+    assert a.shape[-1] == c.shape[-1] == n - 1 and d.shape[b.ndim - 1] == n
+    matrix = d.ndim > b.ndim
+    if matrix:
+        # coefficients broadcast over the columns of d
+        a, b, c = a[..., None], b[..., None], c[..., None]
+    dtype = np.result_type(a, b, c, d, float)
+    # rows along the first axis, so that x[i] is one row of every system
+    a, b, c = (np.moveaxis(v, b.ndim - 1 - matrix, 0) for v in (a, b, c))
+    x = np.moveaxis(np.array(d, dtype=dtype), b.ndim - 1 - matrix, 0)
+    # broadcast shape of one row (np.broadcast_shapes needs numpy 1.20)
+    cp = np.empty((n - 1,) + np.broadcast(c[:1], x[:1]).shape[1:], dtype=dtype)
+    beta = b[0]
+    x[0] = x[0] / beta
+    for i in range(1, n):
+        cp[i-1] = c[i-1] / beta
+        beta = b[i] - a[i-1] * cp[i-1]
+        x[i] = (x[i] - a[i-1] * x[i-1]) / beta
+    for i in reversed(range(n - 1)):
+        x[i] -= cp[i] * x[i+1]
+    return np.moveaxis(x, 0, b.ndim - 1 - matrix)
+
+
+def solve_banded(l_and_u, ab, b):
+    '''
+    Solve banded systems by LU decomposition with partial pivoting
+
+    Works in O(n kl (kl + ku)) time and O(n (kl + ku)) memory per system.
+    Leading dimensions are a stack of independent systems solved together.
+
+    Input Params
+    ------------
+    l_and_u ........ (kl, ku) numbers of sub- and superdiagonals
+    ab ............. band storage (... x (kl + ku + 1) x n), A[i, j] = ab[ku + i - j, j]
+                     (see decomposition.pack_band)
+    b .............. right-hand side (... x n or ... x n x k)
+
+    Output Params
+    -------------
+    x .............. solution of the same shape as b
+    '''
+    kl, ku = l_and_u
+    lub, piv = lu_banded(ab, kl, ku)
+    return lu_solve_banded(l_and_u, lub, piv, b)
+
+
+def lu_solve_banded(l_and_u, lub, piv, b):
+    '''
+    Solve banded systems using factors from decomposition.lu_banded
+
+    Input Params
+    ------------
+    l_and_u ........ (kl, ku) numbers of sub- and superdiagonals
+    lub ............ factors in band storage (... x (2 kl + ku + 1) x n)
+    piv ............ pivoting indices (... x n)
+    b .............. right-hand side (... x n or ... x n x k)
+
+    Output Params
+    -------------
+    x .............. solution of the same shape as b
+    '''
+    kl, ku = l_and_u
+    kv = kl + ku
+    batch, n = lub.shape[:-2], lub.shape[-1]
+    b = np.asarray(b)
+    # kv zero rows of x and columns of the factors past the end
+    ab = np.zeros((int(np.prod(batch)), 2 * kl + ku + 1, n + kv), dtype=lub.dtype)
+    ab[:, :, :n] = lub.reshape(-1, 2 * kl + ku + 1, n)
+    L = ab[:, kv+1:]
+    U = band_windows(ab, 1, kv + 1, kv)[:, :, 0, 1:]
+    piv = piv.reshape(-1, n)
+    b2 = b.reshape(ab.shape[0], n, -1)
+    x = np.zeros((ab.shape[0], n + kv, b2.shape[2]), dtype=np.result_type(lub, b))
+    x[:, :n] = b2
+    rows = np.arange(x.shape[0])
+    for j in range(n):
+        p = piv[:, j]
+        if np.any(p != j):
+            x[:, [j]], x[rows, p, None] = x[rows, p, None], x[:, [j]]
+        x[:, j+1:j+1+kl] -= L[:, :, j, None] * x[:, j, None]
+    for j in reversed(range(n)):
+        x[:, j] -= (U[:, j, None] @ x[:, j+1:j+1+kv])[:, 0]
+        x[:, j] /= ab[:, kv, j, None]
+    return x[:, :n].reshape(b.shape)
@@ -0,0 +1,51 @@
+import numpy as np
+from numericke_metody.decomposition import lu_pivoting_batched
+
+
+def lu_batched(A, b):
+    '''
+    LU method for a stack of independent systems
+
+    Input Params
+    ------------
+    A .............. array of coefficient matrices (batch x n x n)
+    b .............. right-hand sides (batch x n or batch x n x k)
+
+    Output Params
+    -------------
+    x .............. solutions of the same shape as b
+    '''
+    LU, piv = lu_pivoting_batched(A)
+    return lu_solve_batched(LU, piv, b)
+
+
+def lu_solve_batched(LU, piv, b):
+    '''
+    Solve a stack of systems using factors from lu_pivoting_batched
+
+    Input Params
+    ------------
+    LU ............. compact factors (batch x n x n)
+    piv ............ pivoting indices (batch x n)
+    b .............. right-hand sides (batch x n or batch x n x k)
+
+    Output Params
+    -------------
+    x .............. solutions of the same shape as b
+    '''
+    b = np.asarray(b)
+    assert len(b.shape) in (2, 3) and b.shape[:2] == LU.shape[:2]
+    vector = len(b.shape) == 2
+    if vector:
+        b = b[:, :, None]
+    n = LU.shape[1]
+    x = np.take_along_axis(b, piv[:, :, None], axis=1).astype(np.result_type(LU, b))
+    for i in range(1, n):
+        x[:, i] -= (LU[:, i, None, :i] @ x[:, :i])[:, 0]
+    for i in reversed(range(n)):
+        if i < n - 1:
+            x[:, i] -= (LU[:, i, None, i+1:] @ x[:, i+1:])[:, 0]
+        x[:, i] /= LU[:, i, i, None]
+    if vector:
+        return x[:, :, 0]
+    return x
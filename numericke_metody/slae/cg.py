@@ -0,0 +1,107 @@
+import numpy as np
+from .operators import aslinearoperator
+from .preconditioners import make_preconditioner
+from .utils import ColumnTracker, IterationHistory
+
+
+def cg(A, b, x0, eps=0.001, max_iter=100, show_progress=False,
+       trace='full', trace_size=10, callback=None):
+    '''
+    Conjugate gradient method for symmetric positive definite systems
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations
+    show_progress .. print progress of computation
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+
+    Output Params
+    -------------
+    result -> dict
+        x_approx ....... approximation of solution
+        norm_err ....... euclidean norm of the residual b - A x
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norms of the residuals during the computation (see trace)
+    '''
+    return pcg(A, b, x0, None, eps, max_iter, show_progress, trace, trace_size, callback)
+
+
+def pcg(A, b, x0, M='jacobi', eps=0.001, max_iter=100, show_progress=False,
+        trace='full', trace_size=10, callback=None):
+    '''
+    Preconditioned conjugate gradient method for symmetric positive definite systems
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    M .............. preconditioner
+            None ..... no preconditioning (plain CG)
+            'jacobi' . diagonal of A
+            'ssor' ... symmetric SOR with omega = 1
+            'ichol' .. incomplete Cholesky IC(0)
+            'multigrid' one V-cycle (A is a PoissonOperator)
+            operator or function r -> M^-1 r
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations
+    show_progress .. print progress of computation
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+
+    Output Params
+    -------------
+    result -> dict
+        x_approx ....... approximation of solution
+        norm_err ....... euclidean norm of the residual b - A x
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norms of the residuals during the computation (see trace)
+    '''
+    M = make_preconditioner(A, M, len(b))
+    A = aslinearoperator(A, len(b))
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    cols = ColumnTracker(b, x0, history)
+    x = np.copy(cols.x)
+    r = cols.columns(b) - cols.apply(A, x)
+    z = r if M is None else cols.apply(M, r)
+    p = np.copy(z)
+    rz = np.sum(r * z, axis=0)
+    cols.record(0, x, np.linalg.norm(r, axis=0))
+    it = 0
+    while it < max_iter:
+        x, r, p, rz = cols.drop(cols.converged(eps), x, r, p, rz)
+        if cols.done:
+            break
+        it += 1
+        Ap = cols.apply(A, p)
+        alpha = rz / np.sum(p * Ap, axis=0)
+        x += alpha * p
+        r -= alpha * Ap
+        cols.record(it, x, np.linalg.norm(r, axis=0))
+        z = r if M is None else cols.apply(M, r)
+        rz, rz_old = np.sum(r * z, axis=0), rz
+        p = z + (rz / rz_old) * p
+    return cols.result(x)
@@ -0,0 +1,159 @@
+import numpy as np
+from numericke_metody.decomposition import cholesky as cholesky_factorization
+from numericke_metody.decomposition import ldlt as ldlt_factorization
+from numericke_metody.decomposition import solve_triangular
+from .utils import inverse_norm_estimate
+
+
+def cholesky(A, b, packed=False):
+    '''
+    Cholesky method for symmetric positive definite systems
+
+    Input Params
+    ------------
+    A .............. symmetric positive definite coefficient matrix
+    b .............. right-hand side vector (or n x k matrix of right-hand sides)
+    packed ......... keep the factor in packed storage
+
+    Output Params
+    -------------
+    x .............. solution
+    '''
+    return CholeskyFactorization(A, packed=packed).solve(b)
+
+
+def ldlt(A, b):
+    '''
+    LDL^T method for symmetric (possibly indefinite) systems
+
+    Input Params
+    ------------
+    A .............. symmetric coefficient matrix
+    b .............. right-hand side vector (or n x k matrix of right-hand sides)
+
+    Output Params
+    -------------
+    x .............. solution
+    '''
+    L, d, e, piv = ldlt_factorization(A)
+    b = np.asarray(b)
+    y = solve_triangular(L, b[piv], lower=True, unit_diagonal=True, overwrite_b=True)
+    y = _solve_block_diagonal(d, e, y)
+    y = solve_triangular(L, y, lower=True, unit_diagonal=True, trans=True, overwrite_b=True)
+    x = np.empty_like(y)
+    x[piv] = y
+    return x
+
+
+class CholeskyFactorization:
+    '''
+    Cholesky factorization A = L L^T, computed once and reused
+    for any number of right-hand sides
+
+    Input Params
+    ------------
+    A .............. symmetric positive definite matrix
+    packed ......... keep L in packed storage (n(n+1)/2 numbers)
+    block_size ..... number of columns factored per panel
+
+    Attributes
+    ----------
+    L .............. lower triangular factor (packed vector if packed)
+    norm_A ......... 1-norm of A (used by cond_estimate)
+    '''
+
+    def __init__(self, A, packed=False, block_size=128):
+        A = np.asarray(A)
+        self.n = A.shape[0]
+        self.packed = packed
+        self.L = cholesky_factorization(A, packed=packed, block_size=block_size)
+        self.norm_A = np.max(np.sum(np.abs(A), axis=0)) if A.size else 0.0
+
+    def solve(self, B):
+        '''
+        Solve A X = B
+
+        Input Params
+        ------------
+        B .............. right-hand side vector or matrix (n x k)
+
+        Output Params
+        -------------
+        X .............. solution of the same shape as B
+        '''
+        if self.packed:
+            return _packed_cholesky_solve(self.L, self.n, B)
+        Y = solve_triangular(self.L, B, lower=True)
+        return solve_triangular(self.L, Y, lower=True, trans=True, overwrite_b=True)
+
+    def solve_transpose(self, B):
+        '''
+        Solve A^T X = B (same as solve, A is symmetric)
+        '''
+        return self.solve(B)
+
+    def diagonal(self):
+        '''
+        Diagonal of the factor L
+        '''
+        if self.packed:
+            i = np.arange(self.n)
+            return self.L[i * (i + 1) // 2 + i]
+        return np.diagonal(self.L)
+
+    def det(self):
+        '''
+        Determinant of A, the squared product of the diagonal of L
+        '''
+        return np.prod(self.diagonal())**2
+
+    def cond_estimate(self, max_iter=5):
+        '''
+        Estimate of the 1-norm condition number of A (Hager-Higham)
+
+        Input Params
+        ------------
+        max_iter ....... maximum number of estimator steps
+
+        Output Params
+        -------------
+        cond ........... estimate of ||A||_1 * ||A^-1||_1 (a lower bound)
+        '''
+        return self.norm_A * inverse_norm_estimate(self.solve, self.solve, self.n, max_iter)
+
+
+def _packed_cholesky_solve(Lp, n, B):
+    B = np.asarray(B)
+    X = B.astype(np.result_type(Lp, B))
+    start = np.arange(n) * (np.arange(n) + 1) // 2
+    # L y = b, rows of L are contiguous in packed storage
+    for i in range(n):
+        row = Lp[start[i]:start[i]+i+1]
+        X[i] = (X[i] - row[:i] @ X[:i]) / row[i]
+    # L^T x = y, column-oriented so that again only rows of L are read
+    for i in reversed(range(n)):
+        row = Lp[start[i]:start[i]+i+1]
+        X[i] /= row[i]
+        if X.ndim == 1:
+            X[:i] -= row[:i] * X[i]
+        else:
+            X[:i] -= np.outer(row[:i], X[i])
+    return X
+
+
+def _solve_block_diagonal(d, e, y):
+    n = len(d)
+    x = np.array(y, dtype=np.result_type(d, y))
+    blocks = np.flatnonzero(e != 0)
+    single = np.ones(n, dtype=bool)
+    single[blocks] = single[blocks + 1] = False
+    dd = d[single] if y.ndim == 1 else d[single, None]
+    x[single] = y[single] / dd
+    a, c, b = d[blocks], d[blocks + 1], e[blocks]
+    det = a * c - b**2
+    if y.ndim > 1:
+        a, b, c, det = a[:, None], b[:, None], c[:, None], det[:, None]
+    y0, y1 = y[blocks], y[blocks + 1]
+    x[blocks] = (c * y0 - b * y1) / det
+    x[blocks + 1] = (a * y1 - b * y0) / det
+    return x
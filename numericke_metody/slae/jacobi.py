@@ -1,53 +1,52 @@
-import numpy as np
+from .operators import aslinearoperator
+from .utils import stationary_iteration, IterationHistory, column
 
 
-def jacobi(A, b, x0, eps=0.001, max_iter=100, show_progress=False):
+def jacobi(A, b, x0, eps=0.001, max_iter=100, show_progress=False, diag=None,
+           trace='full', trace_size=10, callback=None,
+           checkpoint=None, checkpoint_every=100, resume_from=None):
     '''
     Jacobi method
 
     Input Params
     ------------
-    A .............. coefficient matrix
-    b .............. right-hand side vector
-    x0 ............. vector of the initial approximation
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
     eps ............ tolerance
     max_iter ....... maximum number of iterations
     show_progress .. print progress of computation
+    diag ........... diagonal of A (needed when A is a function)
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+    checkpoint ..... path of an .npz file the iterate, iteration counts and
+                     norms are written to every checkpoint_every iterations
+                     (and at the end), None for no checkpoints
+    checkpoint_every number of iterations between checkpoints
+    resume_from .... path of a checkpoint to continue from (x0 is then ignored and may be None,
+                     max_iter counts the iterations before the resume too)
 
     Output Params
     -------------
-    result -> dict
+    result -> dict
         x_approx ....... approximation of solution
         norm_err ....... euclidean norm of difference of the last two iterations
-        iters .......... number of iterations
-        x_vals ......... approximations of solution during the computation
-        norm_err_vals .. euclidean norm of difference of two successive iterations
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norm of difference of two successive iterations (see trace)
     '''
-    D = np.diag(np.diagonal(A))
-    U, L = np.triu(A) - D, np.tril(A) - D
-    H = np.dot(np.linalg.inv(-D), L + U)
-    g = np.dot(np.linalg.inv(D), b)
-    x_vals, norm_err_vals = list(), [None]
-    x = x0
-    if show_progress:
-        print(f'Initial approximation x0 = {x.flatten()}')
-        print()
-    for it in range(1, max_iter + 1):
-        x_vals.append(x)
-        x = np.dot(H, x) + g
-        norm_err_vals.append(np.linalg.norm(x_vals[-1] - x))
-        if show_progress:
-            print(f'Iteration: {it}')
-            print(f'x = {x.flatten()}, norm_err = {norm_err_vals[-1]}')
-            print()
-        if norm_err_vals[-1] < eps:
-            x_vals.append(x)
-            break
-    result = {
-        'x_approx': x_vals[-1],
-        'norm_err': norm_err_vals[-1],
-        'iters': it,
-        'x_vals': x_vals,
-        'norm_err_vals': norm_err_vals,
-    }
-    return result
+    A = aslinearoperator(A, len(b), diag)
+    assert A.diagonal is not None, 'diagonal of A is required'
+    d = column(A.diagonal, b)
+    step = lambda x, b: x + (b - A @ x) / d
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    return stationary_iteration(step, b, x0, eps, max_iter, history,
+                                checkpoint, checkpoint_every, resume_from)
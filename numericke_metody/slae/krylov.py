@@ -0,0 +1,197 @@
+import numpy as np
+from .operators import aslinearoperator
+from .preconditioners import make_preconditioner
+from .utils import ColumnTracker, IterationHistory
+
+
+def gmres(A, b, x0, restart=30, M=None, side='right', eps=0.001, max_iter=100, show_progress=False,
+          trace='full', trace_size=10, callback=None):
+    '''
+    Restarted GMRES(m) method for general (nonsymmetric) systems
+
+    Only restart + 1 basis vectors are stored, memory does not grow
+    with the number of iterations.
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    restart ........ number of iterations between restarts (m)
+    M .............. preconditioner (see pcg), None for no preconditioning
+    side ........... apply the preconditioner from the 'left' or 'right'
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations (matrix-vector products)
+    show_progress .. print progress of computation
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation, x is None
+                     inside a restart cycle)
+
+    Output Params
+    -------------
+    result -> dict
+        x_approx ....... approximation of solution
+        norm_err ....... euclidean norm of the residual (preconditioned if side='left')
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution at the end of each restart cycle (see trace)
+        norm_err_vals .. euclidean norms of the residuals during the computation (see trace)
+    '''
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    A, b, M, x, cols = _setup(A, b, x0, M, side, history)
+    n = b.shape[0]
+    m = min(restart, n)
+    r = b - A(x)
+    cols.record(0, x, np.linalg.norm(r, axis=0))
+    it = 0
+    while it < max_iter:
+        x, b, r = cols.drop(cols.converged(eps), x, b, r)
+        if cols.done:
+            break
+        # one basis per column, V[j] is the n x k block of the j-th basis vectors
+        k = x.shape[1]
+        V = np.zeros((m + 1, n, k), dtype=x.dtype)
+        H = np.zeros((m + 1, m, k), dtype=x.dtype)
+        g = np.zeros((m + 1, k), dtype=x.dtype)
+        cs, sn = np.zeros((m, k)), np.zeros((m, k))
+        est = np.linalg.norm(r, axis=0)
+        V[0], g[0] = r / est, est
+        dx = np.zeros_like(x)
+        run = np.arange(k)
+        iters = np.full(k, it)
+        for j in range(m):
+            w = A(V[j] if M is None else M(V[j]))
+            # classical Gram-Schmidt applied twice, as matrix products
+            h = np.einsum('ink,nk->ik', V[:j+1], w)
+            w -= np.einsum('ink,ik->nk', V[:j+1], h)
+            h2 = np.einsum('ink,nk->ik', V[:j+1], w)
+            w -= np.einsum('ink,ik->nk', V[:j+1], h2)
+            H[:j+1, j] = h + h2
+            H[j+1, j] = np.linalg.norm(w, axis=0)
+            V[j+1] = w / np.where(H[j+1, j] != 0, H[j+1, j], 1)
+            for i in range(j):
+                H[i, j], H[i+1, j] = cs[i] * H[i, j] + sn[i] * H[i+1, j], -sn[i] * H[i, j] + cs[i] * H[i+1, j]
+            rho = np.hypot(H[j, j], H[j+1, j])
+            safe = np.where(rho != 0, rho, 1)
+            cs[j], sn[j] = np.where(rho != 0, H[j, j] / safe, 1), H[j+1, j] / safe
+            H[j, j], H[j+1, j] = rho, 0
+            g[j], g[j+1] = cs[j] * g[j], -sn[j] * g[j]
+            it += 1
+            est[run], iters[run] = np.abs(g[j+1]), it
+            stop = (np.abs(g[j+1]) < eps) | (H[j, j] == 0)
+            if it >= max_iter or j == m - 1:
+                stop[:] = True
+            if np.any(stop):
+                # columns that stop expanding their basis get their update now
+                dx[:, run[stop]] = _basis_update(V[..., stop], H[..., stop], g[:, stop], j + 1)
+                run = run[~stop]
+                V, H, g, cs, sn = V[..., ~stop], H[..., ~stop], g[:, ~stop], cs[:, ~stop], sn[:, ~stop]
+            if len(run) == 0:
+                break
+            cols.record(it, None, est, iters)
+        x = x + (dx if M is None else M(dx))
+        r = b - A(x)
+        cols.record(it, x, np.linalg.norm(r, axis=0), iters)
+    return cols.result(x)
+
+
+def bicgstab(A, b, x0, M=None, side='right', eps=0.001, max_iter=100, show_progress=False,
+             trace='full', trace_size=10, callback=None):
+    '''
+    BiCGSTAB method for general (nonsymmetric) systems
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    M .............. preconditioner (see pcg), None for no preconditioning
+    side ........... apply the preconditioner from the 'left' or 'right'
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations
+    show_progress .. print progress of computation
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+
+    Output Params
+    -------------
+    result -> dict
+        x_approx ....... approximation of solution
+        norm_err ....... euclidean norm of the residual (preconditioned if side='left')
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norms of the residuals during the computation (see trace)
+    '''
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    A, b, M, x, cols = _setup(A, b, x0, M, side, history)
+    if M is None:
+        M = lambda v: v
+    r = b - A(x)
+    r_hat = np.copy(r)
+    k = x.shape[1]
+    rho, alpha, omega = np.ones(k), np.ones(k), np.ones(k)
+    p = v = np.zeros_like(r)
+    cols.record(0, x, np.linalg.norm(r, axis=0))
+    it = 0
+    while it < max_iter:
+        x, r, r_hat, p, v, rho, alpha, omega = cols.drop(cols.converged(eps), x, r, r_hat, p, v, rho, alpha, omega)
+        if cols.done:
+            break
+        rho_new = np.sum(r_hat * r, axis=0)
+        # breakdown, the column cannot continue
+        x, r, r_hat, p, v, rho, alpha, omega, rho_new = cols.drop(rho_new == 0, x, r, r_hat, p, v, rho, alpha, omega, rho_new)
+        if cols.done:
+            break
+        rho, rho_old = rho_new, rho
+        p = r + (rho / rho_old) * (alpha / omega) * (p - omega * v)
+        p_hat = M(p)
+        v = A(p_hat)
+        alpha = rho / np.sum(r_hat * v, axis=0)
+        s = r - alpha * v
+        s_hat = M(s)
+        t = A(s_hat)
+        tt = np.sum(t * t, axis=0)
+        omega = np.sum(t * s, axis=0) / np.where(tt > 0, tt, 1) * (tt > 0)
+        x = x + alpha * p_hat + omega * s_hat
+        r = s - omega * t
+        it += 1
+        cols.record(it, x, np.linalg.norm(r, axis=0))
+        x, r, r_hat, p, v, rho, alpha, omega = cols.drop(omega == 0, x, r, r_hat, p, v, rho, alpha, omega)
+    return cols.result(x)
+
+
+def _basis_update(V, H, g, k):
+    # V y with y minimizing the rotated least squares problem, R y = g
+    y = np.zeros((k, H.shape[2]), dtype=H.dtype)
+    for i in reversed(range(k)):
+        y[i] = (g[i] - np.einsum('jk,jk->k', H[i, i+1:k], y[i+1:])) / H[i, i]
+    return np.einsum('ink,ik->nk', V[:k], y)
+
+
+def _setup(A, b, x0, M, side, history):
+    # works with n x k blocks of the active columns, see ColumnTracker
+    M = make_preconditioner(A, M, np.shape(b)[0])
+    A = aslinearoperator(A, np.shape(b)[0])
+    cols = ColumnTracker(b, x0, history)
+    matvec = lambda v: cols.apply(A, v)
+    precond = None if M is None else (lambda v: cols.apply(M, v))
+    b, x = cols.columns(b), np.copy(cols.x)
+    if precond is not None and side == 'left':
+        return (lambda v: precond(matvec(v))), precond(b), None, x, cols
+    assert side in ('left', 'right')
+    return matvec, b, precond, x, cols
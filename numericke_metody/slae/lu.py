@@ -1,29 +1,286 @@
 import numpy as np
-from numericke_metody.decomposition import lu as lu_factorization
+from numericke_metody.decomposition import lu_pivoting, solve_triangular
+from .cholesky import CholeskyFactorization
+from .utils import inverse_norm_estimate, is_symmetric, permutation_sign
 
 
-def lu(A, b):
+def lu(A, b, spd=None, precision='double'):
     '''
     LU method
 
+    Symmetric positive definite matrices are solved by the Cholesky
+    factorization instead, which needs half of the work.
+
     Input Params
     ------------
     A .............. coefficient matrix
-    b .............. right-hand side vector
+    b .............. right-hand side vector (or n x k matrix of right-hand sides)
+    spd ............ A is symmetric positive definite
+            None ... detect it (symmetry check and attempted Cholesky)
+            True ... use Cholesky factorization
+            False .. always use LU factorization
+    precision ...... 'double' or 'mixed' (see factorize)
 
     Output Params
     -------------
     x .............. solution
     '''
-    L, U = lu_factorization(A)
-    n = A.shape[0]
-    y = np.copy(b)
-    for i in range(n):
-        for j in range(i):
-            y[i] = y[i] - L[i, j] * y[j]
-    x = np.copy(y)
-    for i in reversed(range(n)):
-        for j in range(i+1, n):
-            x[i] -= U[i, j] * x[j]
-        x[i] /= U[i, i]
-    return x
+    return factorize(A, spd=spd, precision=precision).solve(b)
+
+
+def factorize(A, spd=None, precision='double'):
+    '''
+    Factorize matrix for repeated solves, Cholesky for symmetric positive
+    definite matrices and LU with partial pivoting otherwise
+
+    Input Params
+    ------------
+    A .............. square coefficient matrix
+    spd ............ A is symmetric positive definite
+            None ... detect it (symmetry check and attempted Cholesky)
+            True ... use Cholesky factorization
+            False .. always use LU factorization
+    precision ...... arithmetic of the factorization
+            double ... float64
+            mixed .... float32 LU refined to float64 accuracy (MixedLUFactorization),
+                       spd is ignored
+
+    Output Params
+    -------------
+    F .............. CholeskyFactorization, LUFactorization or MixedLUFactorization
+    '''
+    A = np.asarray(A)
+    assert precision in ('double', 'mixed')
+    if precision == 'mixed':
+        return MixedLUFactorization(A)
+    if spd:
+        return CholeskyFactorization(A)
+    if spd is None and is_symmetric(A) and np.all(np.diagonal(A) > 0):
+        try:
+            return CholeskyFactorization(A)
+        except np.linalg.LinAlgError:
+            pass
+    return LUFactorization(A)
+
+
+class LUFactorization:
+    '''
+    LU factorization with partial pivoting, computed once and reused
+    for any number of right-hand sides
+
+    Input Params
+    ------------
+    A .............. square coefficient matrix
+    block_size ..... number of columns factored per panel
+
+    Attributes
+    ----------
+    LU ............. compact factor, strictly lower part of L and upper part of U
+    piv ............ pivoting indices, A[piv] = L @ U
+    norm_A ......... 1-norm of A (used by cond_estimate)
+    '''
+
+    def __init__(self, A, block_size=128):
+        A = np.asarray(A)
+        assert len(A.shape) == 2 and A.shape[0] == A.shape[1]
+        self.LU, self.piv = lu_pivoting(A, unpack=False, block_size=block_size)
+        self.norm_A = np.max(np.sum(np.abs(A), axis=0)) if A.size else 0.0
+
+    @property
+    def n(self):
+        return self.LU.shape[0]
+
+    def solve(self, B):
+        '''
+        Solve A X = B
+
+        Input Params
+        ------------
+        B .............. right-hand side vector or matrix (n x k)
+
+        Output Params
+        -------------
+        X .............. solution of the same shape as B
+        '''
+        X = np.asarray(B)[self.piv]
+        X = solve_triangular(self.LU, X, lower=True, unit_diagonal=True, overwrite_b=True)
+        return solve_triangular(self.LU, X, lower=False, overwrite_b=True)
+
+    def solve_transpose(self, B):
+        '''
+        Solve A^T X = B
+
+        Input Params
+        ------------
+        B .............. right-hand side vector or matrix (n x k)
+
+        Output Params
+        -------------
+        X .............. solution of the same shape as B
+        '''
+        Y = solve_triangular(self.LU, B, lower=False, trans=True)
+        Y = solve_triangular(self.LU, Y, lower=True, unit_diagonal=True, trans=True, overwrite_b=True)
+        X = np.empty_like(Y)
+        X[self.piv] = Y
+        return X
+
+    def det(self):
+        '''
+        Determinant of A from the diagonal of U and the sign of the permutation
+        '''
+        return permutation_sign(self.piv) * np.prod(np.diagonal(self.LU))
+
+    def perturb_zero_pivots(self, delta):
+        '''
+        Replace exactly zero pivots of U by delta
+
+        The factors then belong to a nearby nonsingular matrix, e.g. for inverse
+        iteration with a shift equal to an eigenvalue. det and cond_estimate
+        describe the perturbed matrix afterwards.
+
+        Input Params
+        ------------
+        delta .......... value of the replaced pivots
+
+        Output Params
+        -------------
+        count .......... number of replaced pivots
+        '''
+        zero = np.flatnonzero(np.diagonal(self.LU) == 0)
+        self.LU[zero, zero] = delta
+        return len(zero)
+
+    def cond_estimate(self, max_iter=5):
+        '''
+        Estimate of the 1-norm condition number of A (Hager-Higham)
+
+        Uses only solves with the stored factors, i.e. O(n^2) operations.
+
+        Input Params
+        ------------
+        max_iter ....... maximum number of estimator steps
+
+        Output Params
+        -------------
+        cond ........... estimate of ||A||_1 * ||A^-1||_1 (a lower bound)
+        '''
+        if np.any(np.diagonal(self.LU) == 0):
+            return np.inf
+        return self.norm_A * inverse_norm_estimate(self.solve, self.solve_transpose, self.n, max_iter)
+
+
+class MixedLUFactorization:
+    '''
+    LU factorization in single precision with iterative refinement
+    to double precision accuracy
+
+    The float32 factor needs half of the memory and memory traffic of the
+    float64 one. Each solve refines x += LU^-1 (b - A x) with float64
+    residuals until ||b - A x|| <= sqrt(n) eps ||A|| ||x|| (infinity norms).
+    When the corrections stop shrinking (A too ill-conditioned for single
+    precision) the matrix is factored again in float64, which is then used
+    for all following solves.
+
+    Input Params
+    ------------
+    A .............. square coefficient matrix (kept for the residuals)
+    block_size ..... number of columns factored per panel
+    max_iter ....... maximum number of refinement steps of one solve
+
+    Attributes
+    ----------
+    factor ......... float32 LUFactorization, or float64 after a fallback
+    fallback ....... the factorization was redone in float64
+    refine_iters ... number of refinement steps of the last solve
+    norm_inf ....... infinity norm of A (used by the refinement tolerance)
+    '''
+
+    def __init__(self, A, block_size=128, max_iter=30):
+        self.A = np.asarray(A, dtype=np.float64)
+        assert len(self.A.shape) == 2 and self.A.shape[0] == self.A.shape[1]
+        self.block_size = block_size
+        self.max_iter = max_iter
+        self.norm_inf = np.max(np.sum(np.abs(self.A), axis=1)) if self.A.size else 0.0
+        self.refine_iters = 0
+        self.fallback = False
+        with np.errstate(over='ignore'):
+            A32 = self.A.astype(np.float32)
+        # out of the float32 range or singular in single precision
+        if not np.all(np.isfinite(A32)):
+            self._use_double()
+            return
+        self.factor = LUFactorization(A32, block_size)
+        if not np.all(np.isfinite(np.diagonal(self.factor.LU))) or np.any(np.diagonal(self.factor.LU) == 0):
+            self._use_double()
+
+    @property
+    def n(self):
+        return self.A.shape[0]
+
+    def solve(self, B):
+        '''
+        Solve A X = B
+
+        Input Params
+        ------------
+        B .............. right-hand side vector or matrix (n x k)
+
+        Output Params
+        -------------
+        X .............. solution of the same shape as B
+        '''
+        B = np.asarray(B, dtype=np.float64)
+        if self.fallback:
+            return self.factor.solve(B)
+        B2 = B.reshape(self.n, -1)
+        X = self._solve_single(B2)
+        tol = np.sqrt(self.n) * np.finfo(np.float64).eps * self.norm_inf
+        active = np.arange(B2.shape[1])
+        step_prev = np.full(len(active), np.inf)
+        for it in range(self.max_iter + 1):
+            self.refine_iters = it
+            R = B2[:, active] - self.A @ X[:, active]
+            done = np.max(np.abs(R), axis=0) <= tol * np.max(np.abs(X[:, active]), axis=0)
+            active, R, step_prev = active[~done], R[:, ~done], step_prev[~done]
+            if len(active) == 0:
+                return X.reshape(B.shape)
+            if it == self.max_iter:
+                break
+            D = self._solve_single(R)
+            step = np.max(np.abs(D), axis=0)
+            # refinement stalls when the corrections do not decrease
+            if not np.all(np.isfinite(step)) or np.any(step > 0.5 * step_prev):
+                break
+            X[:, active] += D
+            step_prev = step
+        self._use_double()
+        return self.factor.solve(B)
+
+    def solve_transpose(self, B):
+        '''
+        Solve A^T X = B (with the factor in use, without refinement)
+        '''
+        return np.asarray(self.factor.solve_transpose(B), dtype=np.float64)
+
+    def det(self):
+        '''
+        Determinant of A from the factor in use
+        '''
+        return np.float64(self.factor.det())
+
+    def cond_estimate(self, max_iter=5):
+        '''
+        Estimate of the 1-norm condition number of A from the factor in use
+        '''
+        return self.factor.cond_estimate(max_iter)
+
+    def _solve_single(self, R):
+        # columns are scaled to avoid under- and overflow in float32
+        scale = np.max(np.abs(R), axis=0)
+        scale[scale == 0] = 1
+        Y = self.factor.solve((R / scale).astype(np.float32))
+        return Y.astype(np.float64) * scale
+
+    def _use_double(self):
+        self.fallback = True
+        self.factor = LUFactorization(self.A, self.block_size)
@@ -0,0 +1,317 @@
+import numpy as np
+from numericke_metody.sparse import CSRMatrix
+from .lu import LUFactorization
+from .operators import LinearOperator
+from .sweeps import colored_sweep
+from .utils import ColumnTracker, IterationHistory, column
+
+
+class PoissonOperator:
+    '''
+    Matrix-free diffusion operator -div(coef grad u) + shift u on a regular grid
+
+    Standard (2 dim + 1)-point finite difference stencil on the interior
+    points of a 1D, 2D or 3D box with zero Dirichlet boundary, unknowns
+    numbered in C order of the grid.
+
+    Input Params
+    ------------
+    grid ........... number of interior points in every dimension
+    h .............. grid step (number or one per dimension), None for the
+                     unit box, h = 1 / (n + 1)
+    coef ........... diffusion coefficient (number or one per dimension)
+    shift .......... reaction coefficient (e.g. 1/dt of an implicit time step)
+
+    Attributes
+    ----------
+    shape .......... (n, n), n is the number of grid points
+    diagonal ....... diagonal of the matrix
+    '''
+
+    def __init__(self, grid, h=None, coef=1, shift=0):
+        self.grid = tuple(int(n) for n in np.atleast_1d(grid))
+        dim = len(self.grid)
+        h = [1 / (n + 1) for n in self.grid] if h is None else np.broadcast_to(h, dim)
+        self.h = tuple(float(v) for v in h)
+        self.coef = tuple(float(c) for c in np.broadcast_to(coef, dim))
+        self.shift = float(shift)
+        n = int(np.prod(self.grid))
+        self.shape = (n, n)
+        self.weights = tuple(c / h**2 for c, h in zip(self.coef, self.h))
+        self._diagonal = None
+        self._colors = None
+
+    @property
+    def diagonal(self):
+        if self._diagonal is None:
+            self._diagonal = np.full(self.shape[0], self.shift + 2 * sum(self.weights))
+        return self._diagonal
+
+    def matvec(self, x):
+        '''
+        Product A @ x, x is a vector or an n x k block
+        '''
+        x = np.asarray(x)
+        u = x.reshape(self.grid + x.shape[1:])
+        y = (self.shift + 2 * sum(self.weights)) * u
+        for a, w in enumerate(self.weights):
+            lo = (slice(None),) * a + (slice(None, -1),)
+            hi = (slice(None),) * a + (slice(1, None),)
+            y[hi] -= w * u[lo]
+            y[lo] -= w * u[hi]
+        return y.reshape(x.shape)
+
+    def dot(self, x):
+        return self.matvec(x)
+
+    def __matmul__(self, x):
+        return self.matvec(x)
+
+    def red_black(self):
+        '''
+        Red-black coloring of the grid points, list of two index arrays
+        '''
+        if self._colors is None:
+            parity = sum(np.arange(n).reshape((-1,) + (1,) * (len(self.grid) - a - 1))
+                         for a, n in enumerate(self.grid)) % 2
+            parity = np.broadcast_to(parity, self.grid).ravel()
+            self._colors = [np.flatnonzero(parity == 0), np.flatnonzero(parity == 1)]
+        return self._colors
+
+    def coarsen(self):
+        '''
+        Operator on the grid with every other point, None if some dimension
+        cannot be coarsened (the number of points must be odd and at least 3)
+        '''
+        if any(n % 2 == 0 or n < 3 for n in self.grid):
+            return None
+        grid = tuple((n - 1) // 2 for n in self.grid)
+        return PoissonOperator(grid, [2 * h for h in self.h], self.coef, self.shift)
+
+    def tocsr(self):
+        '''
+        Matrix of the operator in CSR format
+        '''
+        n = self.shape[0]
+        index = np.arange(n).reshape(self.grid)
+        rows, cols = [index.ravel()], [index.ravel()]
+        vals = [np.full(n, self.shift + 2 * sum(self.weights))]
+        for a, w in enumerate(self.weights):
+            lo = index[(slice(None),) * a + (slice(None, -1),)].ravel()
+            hi = index[(slice(None),) * a + (slice(1, None),)].ravel()
+            rows += [lo, hi]
+            cols += [hi, lo]
+            vals += [np.full(2 * len(lo), -w)]
+        return CSRMatrix.from_coo(np.concatenate(rows), np.concatenate(cols), np.concatenate(vals), (n, n))
+
+    def toarray(self):
+        return self.tocsr().toarray()
+
+
+def prolong(x, grid):
+    '''
+    Linear interpolation from the coarse grid to the fine grid
+
+    Input Params
+    ------------
+    x .............. values on the coarse grid (vector or n_coarse x k block)
+    grid ........... coarse grid, every dimension n is refined to 2 n + 1
+
+    Output Params
+    -------------
+    y .............. values on the fine grid
+    '''
+    u = x.reshape(tuple(grid) + x.shape[1:])
+    for a in range(len(grid)):
+        v = np.moveaxis(u, a, 0)
+        f = np.empty((2 * v.shape[0] + 1,) + v.shape[1:], dtype=v.dtype)
+        f[1::2] = v
+        f[2:-1:2] = 0.5 * (v[:-1] + v[1:])
+        f[0], f[-1] = 0.5 * v[0], 0.5 * v[-1]
+        u = np.moveaxis(f, 0, a)
+    return u.reshape((-1,) + x.shape[1:])
+
+
+def restrict(x, grid):
+    '''
+    Full weighting restriction from the fine grid to the coarse grid
+    (the transpose of prolong divided by 2^dim)
+
+    Input Params
+    ------------
+    x .............. values on the fine grid (vector or n_fine x k block)
+    grid ........... fine grid, every dimension 2 n + 1 is coarsened to n
+
+    Output Params
+    -------------
+    y .............. values on the coarse grid
+    '''
+    u = x.reshape(tuple(grid) + x.shape[1:])
+    for a in range(len(grid)):
+        v = np.moveaxis(u, a, 0)
+        c = 0.5 * v[1:-1:2] + 0.25 * (v[0:-2:2] + v[2::2])
+        u = np.moveaxis(c, 0, a)
+    return u.reshape((-1,) + x.shape[1:])
+
+
+class Multigrid:
+    '''
+    Geometric multigrid hierarchy of a PoissonOperator
+
+    The grid is coarsened while every dimension has an odd number of
+    points (best 2^k m - 1), the coarsest problem is solved by LU.
+
+    Input Params
+    ------------
+    A .............. PoissonOperator on the finest grid
+    cycle .......... 'V' or 'W'
+    smoother ....... 'gauss_seidel' (red-black) or 'jacobi' (damped)
+    pre ............ number of smoothing sweeps before the coarse correction
+    post ........... number of smoothing sweeps after the coarse correction
+    omega .......... damping of the jacobi smoother, None for 2 dim / (2 dim + 1)
+    coarse_size .... stop coarsening at this number of points
+
+    Attributes
+    ----------
+    levels ......... operators from the finest to the coarsest grid
+    coarse ......... LUFactorization of the coarsest operator
+    '''
+
+    def __init__(self, A, cycle='V', smoother='gauss_seidel', pre=2, post=2, omega=None, coarse_size=1000):
+        assert isinstance(A, PoissonOperator), 'geometric multigrid needs a PoissonOperator'
+        assert cycle in ('V', 'W')
+        assert smoother in ('gauss_seidel', 'jacobi')
+        self.gamma = 1 if cycle == 'V' else 2
+        self.smoother = smoother
+        self.pre, self.post = pre, post
+        dim = len(A.grid)
+        self.omega = 2 * dim / (2 * dim + 1) if omega is None else omega
+        self.levels = [A]
+        while self.levels[-1].shape[0] > coarse_size:
+            coarse = self.levels[-1].coarsen()
+            if coarse is None:
+                break
+            self.levels.append(coarse)
+        n = self.levels[-1].shape[0]
+        assert n <= max(coarse_size, 4096), f'grid {self.levels[-1].grid} cannot be coarsened, use 2^k m - 1 points'
+        self.coarse = LUFactorization(self.levels[-1].toarray())
+
+    def cycle(self, b, x=None):
+        '''
+        One multigrid cycle for A x = b
+
+        Input Params
+        ------------
+        b .............. right-hand side (vector or n x k block)
+        x .............. initial approximation, None for zero
+
+        Output Params
+        -------------
+        x .............. new approximation
+        '''
+        b = np.asarray(b, dtype=np.result_type(b, float))
+        x = np.zeros_like(b) if x is None else np.array(x, dtype=b.dtype)
+        return self._cycle(0, b, x)
+
+    def _cycle(self, l, b, x):
+        A = self.levels[l]
+        if l == len(self.levels) - 1:
+            return self.coarse.solve(b)
+        # forward order before and backward after the correction keeps
+        # the cycle symmetric (needed by pcg)
+        x = self._smooth(A, b, x, self.pre, reverse=False)
+        r = restrict(b - A @ x, A.grid)
+        e = np.zeros_like(r)
+        for _ in range(self.gamma):
+            e = self._cycle(l + 1, r, e)
+        x += prolong(e, self.levels[l+1].grid)
+        return self._smooth(A, b, x, self.post, reverse=True)
+
+    def _smooth(self, A, b, x, sweeps, reverse):
+        if self.smoother == 'jacobi':
+            d = column(A.diagonal, x)
+            for _ in range(sweeps):
+                x += self.omega * (b - A @ x) / d
+            return x
+        colors = A.red_black()[::-1] if reverse else A.red_black()
+        for _ in range(sweeps):
+            x = colored_sweep(A, b, x, A.diagonal, colors)
+        return x
+
+
+def multigrid(A, b, x0, eps=0.001, max_iter=100, show_progress=False,
+              cycle='V', smoother='gauss_seidel', pre=2, post=2,
+              trace='full', trace_size=10, callback=None):
+    '''
+    Geometric multigrid method for Poisson-type problems on regular grids
+
+    Every iteration is one cycle, the number of iterations does not grow
+    with the size of the grid.
+
+    Input Params
+    ------------
+    A .............. PoissonOperator or Multigrid hierarchy
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations (cycles)
+    show_progress .. print progress of computation
+    cycle .......... 'V' or 'W' (see Multigrid)
+    smoother ....... 'gauss_seidel' or 'jacobi' (see Multigrid)
+    pre ............ number of smoothing sweeps before the coarse correction
+    post ........... number of smoothing sweeps after the coarse correction
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+
+    Output Params
+    -------------
+    result -> dict
+        x_approx ....... approximation of solution
+        norm_err ....... euclidean norm of the residual b - A x
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norms of the residuals during the computation (see trace)
+    '''
+    mg = A if isinstance(A, Multigrid) else Multigrid(A, cycle, smoother, pre, post)
+    A = mg.levels[0]
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    cols = ColumnTracker(b, x0, history)
+    b, x = cols.columns(b), np.copy(cols.x)
+    cols.record(0, x, np.linalg.norm(b - A @ x, axis=0))
+    it = 0
+    while it < max_iter:
+        x, b = cols.drop(cols.converged(eps), x, b)
+        if cols.done:
+            break
+        it += 1
+        x = mg.cycle(b, x)
+        cols.record(it, x, np.linalg.norm(b - A @ x, axis=0))
+    return cols.result(x)
+
+
+def multigrid_preconditioner(A, cycle='V', smoother='gauss_seidel', pre=1, post=1):
+    '''
+    One multigrid cycle from zero as a preconditioner (for pcg)
+
+    Input Params
+    ------------
+    A .............. PoissonOperator or Multigrid hierarchy
+    cycle .......... 'V' or 'W'
+    smoother ....... 'gauss_seidel' or 'jacobi'
+    pre ............ number of smoothing sweeps before the coarse correction
+    post ........... number of smoothing sweeps after the coarse correction
+                     (pre = post keeps the preconditioner symmetric)
+
+    Output Params
+    -------------
+    M_inv .......... LinearOperator r -> cycle(r)
+    '''
+    mg = A if isinstance(A, Multigrid) else Multigrid(A, cycle, smoother, pre, post)
+    return LinearOperator(mg.levels[0].shape, mg.cycle)
@@ -0,0 +1,67 @@
+import numpy as np
+from numericke_metody.sparse import CSRMatrix
+
+
+class LinearOperator:
+    '''
+    Matrix given only by its action x -> A x
+
+    Any object with a shape attribute and a matvec method can be used
+    where a LinearOperator is expected, this class wraps plain functions.
+
+    Input Params
+    ------------
+    shape .......... (n_rows, n_cols)
+    matvec ......... function x -> A x (x is a vector or an n x k block)
+    diagonal ....... diagonal of A, needed by jacobi, gauss_seidel and sor
+
+    Attributes
+    ----------
+    shape .......... (n_rows, n_cols)
+    diagonal ....... diagonal of A or None
+    '''
+
+    def __init__(self, shape, matvec, diagonal=None):
+        self.shape = tuple(shape)
+        self._matvec = matvec
+        self.diagonal = None if diagonal is None else np.asarray(diagonal)
+
+    def matvec(self, x):
+        return self._matvec(x)
+
+    def dot(self, x):
+        return self._matvec(x)
+
+    def __matmul__(self, x):
+        return self._matvec(x)
+
+
+def aslinearoperator(A, n=None, diagonal=None):
+    '''
+    Wrap dense array, CSRMatrix, operator or function as LinearOperator
+
+    Input Params
+    ------------
+    A .............. dense array, sparse.CSRMatrix, object with shape and matvec,
+                     or function x -> A x
+    n .............. order of A, needed only when A is a function
+    diagonal ....... diagonal of A, overrides the one taken from A
+
+    Output Params
+    -------------
+    op ............. LinearOperator
+    '''
+    if isinstance(A, LinearOperator) and diagonal is None:
+        return A
+    if isinstance(A, CSRMatrix):
+        return LinearOperator(A.shape, A.dot, A.diagonal() if diagonal is None else diagonal)
+    if hasattr(A, 'shape') and hasattr(A, 'matvec'):
+        if diagonal is None:
+            diagonal = getattr(A, 'diagonal', None)
+            diagonal = diagonal() if callable(diagonal) else diagonal
+        return LinearOperator(A.shape, A.matvec, diagonal)
+    if callable(A):
+        assert n is not None
+        return LinearOperator((n, n), A, diagonal)
+    A = np.asarray(A)
+    return LinearOperator(A.shape, A.dot, np.diagonal(A) if diagonal is None else diagonal)
@@ -0,0 +1,107 @@
+import numpy as np
+from numericke_metody.decomposition import solve_triangular
+from numericke_metody.sparse import CSRMatrix, incomplete_cholesky, spsolve_triangular
+from .multigrid import multigrid_preconditioner
+from .operators import LinearOperator, aslinearoperator
+from .utils import column
+
+
+def jacobi_preconditioner(A):
+    '''
+    Jacobi (diagonal) preconditioner M = D
+
+    Input Params
+    ------------
+    A .............. coefficient matrix or operator with a diagonal
+
+    Output Params
+    -------------
+    M_inv .......... LinearOperator r -> D^-1 r
+    '''
+    op = aslinearoperator(A)
+    assert op.diagonal is not None, 'diagonal of A is required'
+    d = op.diagonal
+    return LinearOperator(op.shape, lambda r: r / column(d, r), d)
+
+
+def ssor_preconditioner(A, omega=1):
+    '''
+    SSOR preconditioner M = omega/(2-omega) (D/omega + L) (D/omega)^-1 (D/omega + U)
+
+    Input Params
+    ------------
+    A .............. dense array or sparse.CSRMatrix
+    omega .......... relaxation parameter from the interval (0, 2)
+
+    Output Params
+    -------------
+    M_inv .......... LinearOperator r -> M^-1 r
+    '''
+    c = (2 - omega) / omega
+    if isinstance(A, CSRMatrix):
+        d = A.diagonal()
+        lower, upper = A.level_schedule(lower=True), A.level_schedule(lower=False)
+
+        def apply(r):
+            # (D + omega L) y = omega r, (D + omega U) z = D y
+            y = lower.solve(omega * r, d, scale=omega)
+            return c * upper.solve(column(d, y) * y, d, scale=omega)
+    else:
+        A = np.asarray(A)
+        assert A.ndim == 2, 'dense array or CSRMatrix A is required'
+        d = np.diagonal(A)
+        L = omega * np.tril(A, -1) + np.diag(d)
+        U = omega * np.triu(A, 1) + np.diag(d)
+
+        def apply(r):
+            y = solve_triangular(L, omega * r, lower=True, overwrite_b=True)
+            return c * solve_triangular(U, column(d, y) * y, lower=False, overwrite_b=True)
+    return LinearOperator(A.shape, apply)
+
+
+def ichol_preconditioner(A):
+    '''
+    Incomplete Cholesky preconditioner M = L L^T, L from IC(0)
+
+    Input Params
+    ------------
+    A .............. symmetric positive definite dense array or sparse.CSRMatrix
+
+    Output Params
+    -------------
+    M_inv .......... LinearOperator r -> (L L^T)^-1 r
+    '''
+    if not isinstance(A, CSRMatrix):
+        A = CSRMatrix.from_dense(A)
+    L = incomplete_cholesky(A)
+    LT = L.transpose()
+    return LinearOperator(A.shape, lambda r: spsolve_triangular(LT, spsolve_triangular(L, r), lower=False))
+
+
+def make_preconditioner(A, M, n=None):
+    '''
+    Preconditioner from its name or an operator
+
+    Input Params
+    ------------
+    A .............. coefficient matrix
+    M .............. None, 'jacobi', 'ssor', 'ichol', 'multigrid' (A is a PoissonOperator),
+                     operator or function r -> M^-1 r
+    n .............. order of A, needed only when A is a function
+
+    Output Params
+    -------------
+    M_inv .......... LinearOperator r -> M^-1 r or None
+    '''
+    if M is None:
+        return None
+    if isinstance(M, str):
+        preconditioners = {
+            'jacobi': jacobi_preconditioner,
+            'ssor': ssor_preconditioner,
+            'ichol': ichol_preconditioner,
+            'multigrid': multigrid_preconditioner,
+        }
+        assert M in preconditioners, f'unknown preconditioner {M}'
+        return preconditioners[M](A)
+    return aslinearoperator(M, aslinearoperator(A, n).shape[0])
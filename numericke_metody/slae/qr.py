@@ -0,0 +1,21 @@
+from numericke_metody.decomposition import qr_factor, apply_q, solve_triangular
+
+
+def qr(A, b):
+    '''
+    QR method, for overdetermined systems it gives the least-squares solution
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (m x n, m >= n, full column rank)
+    b .............. right-hand side vector (or m x k matrix of right-hand sides)
+
+    Output Params
+    -------------
+    x .............. solution minimizing ||A x - b||_2
+    '''
+    QR, tau = qr_factor(A)
+    m, n = QR.shape
+    assert m >= n
+    y = apply_q(QR, tau, b, trans=True)[:n]
+    return solve_triangular(QR[:n], y, lower=False, overwrite_b=True)
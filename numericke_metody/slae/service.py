@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from .batched import lu_batched
+from .gem import gaussian_elimination_pivoting
+from .lu import lu
+
+
+class SolverService:
+    '''
+    Local service solving independent linear systems on a pool of processes
+
+    Jobs from any number of threads (or asyncio tasks) are collected into
+    batches, every batch is one task of a worker process. The matrices,
+    right-hand sides and solutions of a batch travel in one shared memory
+    block, only its layout is pickled.
+
+    Input Params
+    ------------
+    workers ........ number of worker processes, None for os.cpu_count()
+    method ......... solver run by the workers
+            lu ........ slae.lu
+            gem ....... gaussian_elimination_pivoting (right-hand side vectors only)
+            batched ... lu_batched over the systems of equal shape in a batch
+    batch_size ..... maximum number of systems in a batch
+    max_delay ...... seconds a batch waits to be filled before it is sent
+    mp_context ..... multiprocessing start method of the workers
+
+    Usage
+    -----
+    with SolverService(workers=4) as service:
+        futures = [service.submit(A, b) for A, b in systems]
+        x = [f.result() for f in futures]
+        # or inside a coroutine: x = await service.solve(A, b)
+    '''
+
+    def __init__(self, workers=None, method='lu', batch_size=64, max_delay=0.005, mp_context='spawn'):
+        assert method in _METHODS
+        self.method = method
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(mp_context))
+        self.jobs = queue.Queue()
+        self.closed = False
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, A, b):
+        '''
+        Submit the system A x = b
+
+        Input Params
+        ------------
+        A .............. square coefficient matrix
+        b .............. right-hand side vector or matrix (n x k)
+
+        Output Params
+        -------------
+        future ......... concurrent.futures.Future of the solution x
+        '''
+        assert not self.closed, 'service is closed'
+        A, b = np.asarray(A), np.asarray(b)
+        assert len(A.shape) == 2 and A.shape[0] == A.shape[1] and b.shape[0] == A.shape[0]
+        future = Future()
+        self.jobs.put((A, b, future))
+        return future
+
+    async def solve(self, A, b):
+        '''
+        Solve A x = b without blocking the event loop
+        '''
+        return await asyncio.wrap_future(self.submit(A, b))
+
+    def close(self):
+        '''
+        Finish the submitted jobs and stop the workers
+        '''
+        if not self.closed:
+            self.closed = True
+            self.jobs.put(None)
+            self.dispatcher.join()
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _dispatch(self):
+        stop = False
+        while not stop:
+            job = self.jobs.get()
+            if job is None:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.jobs.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._send(batch)
+
+    def _send(self, batch):
+        arrays = [a for A, b, _ in batch for a in (A, b)]
+        dtypes = [np.result_type(A, b, float) for A, b, _ in batch]
+        # A, b and x of every job, each array aligned to 64 bytes
+        layout, size = [], 0
+        for (A, b, _), dtype in zip(batch, dtypes):
+            entry = []
+            for shape, dt in ((A.shape, A.dtype), (b.shape, b.dtype), (b.shape, dtype)):
+                entry.append((size, shape, dt.str))
+                size += -(-int(np.prod(shape)) * dt.itemsize // 64) * 64
+            layout.append(entry)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (offset, shape, dt), a in zip([e for entry in layout for e in entry[:2]], arrays):
+            np.ndarray(shape, dt, shm.buf, offset)[...] = a
+        task = self.executor.submit(_solve_batch, shm.name, layout, self.method)
+        task.add_done_callback(lambda task: _finish(task, shm, layout, batch))
+
+
+def _finish(task, shm, layout, batch):
+    try:
+        errors = task.result()
+        for (_, _, (offset, shape, dt)), (_, _, future), error in zip(layout, batch, errors):
+            if error is None:
+                future.set_result(np.array(np.ndarray(shape, dt, shm.buf, offset)))
+            else:
+                future.set_exception(error)
+    except BaseException as e:
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _solve_batch(name, layout, method):
+    # runs in a worker process, solutions are written to the shared block
+    shm = shared_memory.SharedMemory(name=name)
+    systems = [[np.ndarray(shape, dt, shm.buf, offset) for offset, shape, dt in entry] for entry in layout]
+    try:
+        return _METHODS[method](systems)
+    finally:
+        # views must be released before the block can be closed
+        del systems
+        shm.close()
+
+
+def _solve_each(solve):
+    def run(systems):
+        errors = []
+        for A, b, x in systems:
+            try:
+                x[...] = np.reshape(solve(A, b), x.shape)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e.with_traceback(None))
+        return errors
+    return run
+
+
+def _solve_grouped(systems):
+    # systems of equal shapes are solved by one call of lu_batched
+    errors = [None] * len(systems)
+    groups = {}
+    for i, (A, b, x) in enumerate(systems):
+        groups.setdefault((A.shape, b.shape, x.dtype.str), []).append(i)
+    for idx in groups.values():
+        try:
+            X = lu_batched(np.stack([systems[i][0] for i in idx]), np.stack([systems[i][1] for i in idx]))
+            for i, x in zip(idx, X):
+                systems[i][2][...] = x
+        except Exception as e:
+            for i in idx:
+                errors[i] = e.with_traceback(None)
+    return errors
+
+
+_METHODS = {
+    'lu': _solve_each(lu),
+    'gem': _solve_each(lambda A, b: gaussian_elimination_pivoting(A, np.reshape(b, (-1, 1)))),
+    'batched': _solve_grouped,
+}
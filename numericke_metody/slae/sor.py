@@ -1,73 +1,267 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from numericke_metody.sparse import CSRMatrix
+from .operators import aslinearoperator
+from .sweeps import make_sweep
+from .utils import stationary_iteration, IterationHistory, is_symmetric
 
 
-def sor(A, b, x0, omega, eps=0.001, max_iter=100, show_progress=False):
+def sor(A, b, x0, omega, eps=0.001, max_iter=100, show_progress=False,
+        colors=None, ordering='natural', workers=1, diag=None,
+        trace='full', trace_size=10, callback=None,
+        checkpoint=None, checkpoint_every=100, resume_from=None):
     '''
     SOR method
 
     Input Params
     ------------
-    A .............. coefficient matrix
-    b .............. right-hand side vector
-    x0 ............. vector of the initial approximation
-    omega .......... relaxation parameter from the interval (0, 2)
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    b .............. right-hand side vector (or n x k block of right-hand sides)
+    x0 ............. initial approximation of the shape of b
+    omega .......... relaxation parameter from the interval (0, 2), or 'auto'
+                     to start with compute_opt_omega(A) and refine it from
+                     the observed convergence rate (see AdaptiveOmega)
     eps ............ tolerance
     max_iter ....... maximum number of iterations
     show_progress .. print progress of computation
+    colors ......... list of index arrays of mutually uncoupled unknowns,
+                     sweep color by color (required when A is an operator)
+    ordering ....... order in which the unknowns are relaxed
+            natural ...... row by row
+            multicolor ... color by color, colors found from the sparsity pattern
+    workers ........ number of threads relaxing one color (multicolor only)
+    diag ........... diagonal of A (needed when A is a function)
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+    checkpoint ..... path of an .npz file the iterate, iteration counts and
+                     norms are written to every checkpoint_every iterations
+                     (and at the end), None for no checkpoints
+    checkpoint_every number of iterations between checkpoints
+    resume_from .... path of a checkpoint to continue from (x0 is then ignored and may be None,
+                     max_iter counts the iterations before the resume too)
 
     Output Params
     -------------
     result -> dict
         x_approx ....... approximation of solution
         norm_err ....... euclidean norm of difference of the last two iterations
-        iters .......... number of iterations
-        x_vals ......... approximations of solution during the computation
-        norm_err_vals .. euclidean norm of difference of two successive iterations
+                         (per column for a block of right-hand sides)
+        iters .......... number of iterations (per column for a block)
+        x_vals ......... approximations of solution during the computation (see trace)
+        norm_err_vals .. euclidean norm of difference of two successive iterations (see trace)
+        omega .......... final relaxation parameter (only with omega='auto')
     '''
-    D = np.diag(np.diagonal(A))
-    U, L = np.triu(A) - D, np.tril(A) - D
-    H = np.dot(np.linalg.inv(omega * L + D), (1 - omega) * D - omega * U)
-    g = np.dot(np.linalg.inv(omega * L + D), omega * b)
-    x_vals, norm_err_vals = list(), [None]
-    x = x0
-    if show_progress:
-        print(f'Initial approximation x0 = {x.flatten()}')
-        print()
-    for it in range(1, max_iter + 1):
-        x_vals.append(x)
-        x = np.dot(H, x) + g
-        norm_err_vals.append(np.linalg.norm(x_vals[-1] - x))
-        if show_progress:
-            print(f'Iteration: {it}')
-            print(f'x = {x.flatten()}, norm_err = {norm_err_vals[-1]}')
-            print()
-        if norm_err_vals[-1] < eps:
-            x_vals.append(x)
-            break
-    result = {
-        'x_approx': x_vals[-1],
-        'norm_err': norm_err_vals[-1],
-        'iters': it,
-        'x_vals': x_vals,
-        'norm_err_vals': norm_err_vals,
-    }
-    return result
+    history = IterationHistory(trace, trace_size, callback, show_progress)
+    executor = ThreadPoolExecutor(workers) if workers > 1 else None
+    try:
+        if omega == 'auto':
+            omega0 = compute_opt_omega(A, diag=diag)
+            step = AdaptiveOmega(make_sweep(A, b, omega0, colors, ordering, diag, workers, executor), omega0)
+            result = stationary_iteration(step, b, x0, eps, max_iter, history,
+                                          checkpoint, checkpoint_every, resume_from)
+            result['omega'] = step.omega
+            return result
+        step = make_sweep(A, b, omega, colors, ordering, diag, workers, executor)
+        return stationary_iteration(step, b, x0, eps, max_iter, history,
+                                    checkpoint, checkpoint_every, resume_from)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
-def compute_opt_omega(A):
+def compute_opt_omega(A, max_iter=20, diag=None, method=None):
     '''
     Compute optimal omega for SOR method
 
+    omega = 2 / (1 + sqrt(1 - rho^2)), rho is the spectral radius of the
+    Jacobi iteration matrix estimated by jacobi_spectral_radius. The
+    formula holds for consistently ordered matrices with a real Jacobi
+    spectrum (e.g. symmetric positive definite, 5-point stencils).
+
+    Input Params
+    ------------
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    max_iter ....... maximum number of steps of the estimator
+    diag ........... diagonal of A (needed when A is a function)
+    method ......... estimator, see jacobi_spectral_radius
+
+    Output Params
+    -------------
+    omega .......... optimal omega (1 if the Jacobi method does not converge)
+    '''
+    rho = jacobi_spectral_radius(A, max_iter, diag=diag, method=method)
+    if rho >= 1:
+        return 1.0
+    return 2 / (1 + np.sqrt(1 - rho**2))
+
+
+def jacobi_spectral_radius(A, max_iter=20, eps=1e-2, diag=None, method=None):
+    '''
+    Estimate of the spectral radius of the Jacobi iteration matrix I - D^-1 A
+
+    Only products with A are used, every step costs one matvec.
+
     Input Params
     ------------
-    A .............. coefficient matrix
+    A .............. coefficient matrix (dense array, sparse.CSRMatrix,
+                     LinearOperator or function x -> A x)
+    max_iter ....... maximum number of steps
+    eps ............ change of the estimate relative to 1 - rho to stop at
+    diag ........... diagonal of A (needed when A is a function)
+    method ......... estimator
+            lanczos .. extreme Ritz values of D^-1/2 A D^-1/2, for symmetric A
+                       with a positive diagonal (a lower bound of rho)
+            power .... growth of ||H^k x||, for any A
+            None ..... lanczos for a symmetric dense array or CSRMatrix with
+                       a positive diagonal, power otherwise
 
     Output Params
     -------------
-    omega .......... optimal omega
+    rho ............ estimate of the spectral radius
     '''
-    D = np.diag(np.diagonal(A))
-    U, L = np.triu(A) - D, np.tril(A) - D
-    H = np.dot(np.linalg.inv(-D), L + U)
-    eig_max = np.max(np.linalg.eigvals(H))
-    return 2 / (1 + np.sqrt(1 - np.power(eig_max, 2)))
+    n = A.shape[0] if hasattr(A, 'shape') else len(diag)
+    if method is None:
+        method = 'lanczos' if _symmetric_positive_diagonal(A, diag) else 'power'
+    A = aslinearoperator(A, n, diag)
+    assert A.diagonal is not None, 'diagonal of A is required'
+    d = A.diagonal
+    v = np.random.default_rng(0).standard_normal(n)
+    if method == 'power':
+        # H has eigenvalue pairs +-mu for consistently ordered A, so the
+        # norm is compared after two steps
+        H = lambda x: x - (A @ x) / d
+        v /= np.linalg.norm(v)
+        rho = 0
+        for it in range(max_iter // 2):
+            w = H(H(v))
+            rho, rho_old = np.sqrt(np.linalg.norm(w)), rho
+            if rho == 0:
+                break
+            v = w / rho**2
+            if it > 0 and abs(rho - rho_old) <= eps * abs(1 - rho):
+                break
+        return rho
+    assert method == 'lanczos'
+    assert np.all(d > 0), 'lanczos needs a positive diagonal'
+    s = 1 / np.sqrt(d)
+    v /= np.linalg.norm(v)
+    v_prev = np.zeros(n)
+    alpha, beta = [], []
+    rho = 0
+    for it in range(min(max_iter, n)):
+        w = s * (A @ (s * v)) - (beta[-1] * v_prev if beta else 0)
+        alpha.append(w @ v)
+        w -= alpha[-1] * v
+        T = np.diag(alpha) + np.diag(beta, 1) + np.diag(beta, -1)
+        theta = np.linalg.eigvalsh(T)
+        rho, rho_old = max(abs(1 - theta[0]), abs(1 - theta[-1])), rho
+        b = np.linalg.norm(w)
+        if b <= 1e-12 * abs(alpha[-1]) or it > 0 and abs(rho - rho_old) <= eps * abs(1 - rho):
+            break
+        beta.append(b)
+        v_prev, v = v, w / b
+    return rho
+
+
+def _symmetric_positive_diagonal(A, diag=None):
+    # symmetry and positive diagonal of a dense array or CSRMatrix,
+    # False for operators and functions (symmetry cannot be checked)
+    if isinstance(A, CSRMatrix):
+        if A.shape[0] != A.shape[1]:
+            return False
+        # entries sorted by (i, j) against the ones sorted by (j, i)
+        rows = np.lexsort((A.indices, A.row_ids))
+        cols = np.lexsort((A.row_ids, A.indices))
+        symmetric = (np.array_equal(A.row_ids[rows], A.indices[cols])
+                     and np.array_equal(A.indices[rows], A.row_ids[cols])
+                     and np.max(np.abs(A.data[rows] - A.data[cols]), initial=0)
+                     <= 1e-10 * np.max(np.abs(A.data), initial=0))
+        d = A.diagonal()
+    elif callable(A) or hasattr(A, 'matvec'):
+        return False
+    else:
+        symmetric = is_symmetric(A)
+        d = np.diagonal(np.asarray(A)) if symmetric else None
+    if diag is not None:
+        d = np.asarray(diag)
+    return bool(symmetric and np.all(d > 0))
+
+
+class AdaptiveOmega:
+    '''
+    SOR step with omega refined from the observed convergence rate
+
+    Starts with the given omega (at most the optimum) and measures the rate
+    r = ||x_{k+1} - x_k|| / ||x_k - x_{k-1}||. For consistently ordered
+    matrices (r + omega - 1)^2 = r omega^2 mu^2 gives an estimate of the
+    Jacobi spectral radius mu and omega is moved to 2 / (1 + sqrt(1 - mu^2)).
+    The estimate is refined while the iteration converges noticeably
+    slower than (omega - 1) (Hageman, Young: Applied Iterative Methods).
+
+    Input Params
+    ------------
+    sweep .......... function (x, b, omega) -> approximation after one sweep
+    omega .......... initial relaxation parameter
+    window ......... number of sweeps the rate is measured over
+    strictness ..... exponent F of the test r > (omega - 1)^F
+    tol ............ agreement of two successive rates, relative to 1 - r,
+                     required before the rate is trusted
+
+    Attributes
+    ----------
+    omega .......... current relaxation parameter
+    mu ............. current estimate of the Jacobi spectral radius
+    '''
+
+    def __init__(self, sweep, omega=1.0, window=5, strictness=0.75, tol=0.01):
+        self.sweep = sweep
+        self.omega = omega
+        self.window = window
+        self.strictness = strictness
+        self.tol = tol
+        # mu for which omega is optimal, the estimates only increase from it
+        self.mu = np.sqrt(1 - (2 / omega - 1)**2) if omega > 1 else 0.0
+        self.diffs = []
+
+    def __call__(self, x, b):
+        x_new = self.sweep(x, b, omega=self.omega)
+        self.diffs.append(np.linalg.norm(x_new - x))
+        if len(self.diffs) > 2 * self.window:
+            self._update()
+        return x_new
+
+    def state(self):
+        '''
+        Arrays to continue the adaptation from (see stationary_iteration)
+        '''
+        return {'omega': self.omega, 'mu': self.mu, 'diffs': np.array(self.diffs)}
+
+    def restore(self, state):
+        self.omega = float(state['omega'])
+        self.mu = float(state['mu'])
+        self.diffs = list(state['diffs'])
+
+    def _update(self):
+        # rates over the last two windows, the estimate is used only once
+        # they agree, i.e. after the transient following a change of omega
+        d = self.diffs[-2 * self.window - 1:]
+        if np.min(d) == 0:
+            return
+        r0 = (d[self.window] / d[0])**(1 / self.window)
+        r = (d[-1] / d[self.window])**(1 / self.window)
+        if r >= 1 or abs(r - r0) > self.tol * (1 - r) or r <= (self.omega - 1)**self.strictness:
+            return
+        mu = (r + self.omega - 1) / (self.omega * np.sqrt(r))
+        if mu > self.mu:
+            self.mu = min(mu, 1 - 1e-12)
+            self.omega = 2 / (1 + np.sqrt(1 - self.mu**2))
+            self.diffs = []
@@ -0,0 +1,182 @@
+import numpy as np
+from numericke_metody.sparse import CSRMatrix, greedy_coloring
+from .operators import aslinearoperator
+from .utils import column
+
+
+def make_sweep(A, b, omega=1, colors=None, ordering='natural', diag=None, workers=1, executor=None):
+    '''
+    Gauss-Seidel (omega = 1) or SOR sweep suited to the kind of A
+
+    Input Params
+    ------------
+    A .............. dense array, sparse.CSRMatrix, LinearOperator or function x -> A x
+    b .............. right-hand side
+    omega .......... relaxation parameter
+    colors ......... list of index arrays of mutually uncoupled unknowns
+    ordering ....... 'natural' or 'multicolor' (colors from the sparsity pattern)
+    diag ........... diagonal of A (needed when A is a function)
+    workers ........ number of parts each color is split into
+    executor ....... thread pool relaxing the parts of a color in parallel
+
+    Output Params
+    -------------
+    step ........... function (x, b, omega=omega) -> approximation after one sweep
+    '''
+    is_operator = callable(A) or hasattr(A, 'matvec')
+    if not is_operator and not isinstance(A, CSRMatrix):
+        A = np.asarray(A)
+    if colors is None and ordering == 'multicolor':
+        assert not is_operator, 'operator A needs explicit colors'
+        colors = greedy_coloring(A if isinstance(A, CSRMatrix) else CSRMatrix.from_dense(A))
+    assert ordering in ('natural', 'multicolor')
+    dtype = lambda x: np.result_type(b, x, float)
+    if colors is not None and not is_operator:
+        blocks = color_blocks(A, colors, workers)
+        return lambda x, b, omega=omega: multicolor_sweep(blocks, b, x.astype(dtype(x)), omega, executor)
+    if colors is not None:
+        A = aslinearoperator(A, len(b), diag)
+        assert A.diagonal is not None, 'diagonal of A is required'
+        return lambda x, b, omega=omega: colored_sweep(A, b, x.astype(dtype(x)), A.diagonal, colors, omega)
+    assert not is_operator, 'operator A needs a coloring of the unknowns'
+    if isinstance(A, CSRMatrix):
+        d, U, levels = A.diagonal(), A.triu(1), A.level_schedule(lower=True)
+        return lambda x, b, omega=omega: sparse_sweep(d, U, levels, b, x, omega)
+    return lambda x, b, omega=omega: dense_sweep(A, b, x.astype(np.result_type(A, dtype(x))), omega)
+
+
+def dense_sweep(A, b, x, omega=1, block_size=64):
+    '''
+    One in-place Gauss-Seidel (omega = 1) or SOR sweep over a dense matrix
+
+    Rows are relaxed in blocks, the coupling to the other blocks is one
+    matrix product per block, only the rows inside a block are relaxed
+    one by one.
+
+    Input Params
+    ------------
+    A .............. dense coefficient matrix
+    b .............. right-hand side
+    x .............. current approximation, overwritten by the new one
+    omega .......... relaxation parameter
+    block_size ..... number of rows relaxed between matrix products
+
+    Output Params
+    -------------
+    x .............. new approximation
+    '''
+    n = A.shape[0]
+    x2, b2 = x.reshape(n, -1), b.reshape(n, -1)
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        s = b2[i0:i1] - A[i0:i1, :i0] @ x2[:i0] - A[i0:i1, i1:] @ x2[i1:]
+        for i in range(i0, i1):
+            r = s[i-i0] - A[i, i0:i] @ x2[i0:i] - A[i, i+1:i1] @ x2[i+1:i1]
+            x2[i] += omega * (r / A[i, i] - x2[i])
+    return x
+
+
+def sparse_sweep(d, U, levels, b, x, omega=1):
+    '''
+    One Gauss-Seidel (omega = 1) or SOR sweep over a sparse matrix
+
+    Solves (D + omega L) x_new = omega (b - U x) + (1 - omega) D x
+    level by level (see CSRMatrix.level_schedule).
+
+    Input Params
+    ------------
+    d .............. diagonal of A
+    U .............. strictly upper triangle of A (CSRMatrix)
+    levels ......... level schedule of the strictly lower triangle of A
+    b .............. right-hand side
+    x .............. current approximation
+    omega .......... relaxation parameter
+
+    Output Params
+    -------------
+    x .............. new approximation
+    '''
+    rhs = omega * (b - U @ x)
+    if omega != 1:
+        rhs += (1 - omega) * column(d, x) * x
+    return levels.solve(rhs, d, scale=omega)
+
+
+def colored_sweep(A, b, x, d, colors, omega=1):
+    '''
+    One in-place Gauss-Seidel (omega = 1) or SOR sweep in multicolor ordering
+
+    Unknowns of one color must not be coupled with each other, so the whole
+    color is relaxed at once from one operator application.
+
+    Input Params
+    ------------
+    A .............. operator with matvec (x -> A x)
+    b .............. right-hand side
+    x .............. current approximation, overwritten by the new one
+    d .............. diagonal of A
+    colors ......... list of index arrays, one per color
+    omega .......... relaxation parameter
+
+    Output Params
+    -------------
+    x .............. new approximation
+    '''
+    for c in colors:
+        r = (b - A @ x)[c]
+        x[c] += omega * r / column(d[c], r)
+    return x
+
+
+def color_blocks(A, colors, workers=1):
+    '''
+    Row blocks of a matrix for multicolor sweeps
+
+    Input Params
+    ------------
+    A .............. dense array or sparse.CSRMatrix
+    colors ......... list of index arrays, one per color
+    workers ........ number of parts each color is split into
+
+    Output Params
+    -------------
+    blocks ......... per color a list of (rows, A[rows], diagonal[rows])
+    '''
+    d = A.diagonal() if isinstance(A, CSRMatrix) else np.diagonal(A)
+    blocks = []
+    for c in colors:
+        parts = [rows for rows in np.array_split(np.asarray(c), workers) if len(rows)]
+        take = A.take_rows if isinstance(A, CSRMatrix) else (lambda rows: A[rows])
+        blocks.append([(rows, take(rows), d[rows]) for rows in parts])
+    return blocks
+
+
+def multicolor_sweep(blocks, b, x, omega=1, executor=None):
+    '''
+    One in-place Gauss-Seidel (omega = 1) or SOR sweep in multicolor ordering
+
+    Each color is one product of its row block with x, optionally split
+    over the threads of executor (NumPy releases the GIL in the products).
+
+    Input Params
+    ------------
+    blocks ......... row blocks from color_blocks
+    b .............. right-hand side
+    x .............. current approximation, overwritten by the new one
+    omega .......... relaxation parameter
+    executor ....... thread pool or None
+
+    Output Params
+    -------------
+    x .............. new approximation
+    '''
+    def relax(block):
+        rows, A_rows, d_rows = block
+        r = b[rows] - A_rows @ x
+        return rows, omega * r / column(d_rows, r)
+
+    for color in blocks:
+        updates = list(map(relax, color) if executor is None else executor.map(relax, color))
+        for rows, dx in updates:
+            x[rows] += dx
+    return x
@@ -0,0 +1,418 @@
+import os
+from collections import deque
+
+import numpy as np
+
+
+def inverse_norm_estimate(solve, solve_transpose, n, max_iter=5):
+    '''
+    Hager-Higham estimate of ||A^-1||_1 from solves with A and A^T
+
+    Input Params
+    ------------
+    solve .......... function x -> A^-1 x
+    solve_transpose  function x -> A^-T x
+    n .............. order of A
+    max_iter ....... maximum number of estimator steps
+
+    Output Params
+    -------------
+    est ............ estimate of ||A^-1||_1 (a lower bound)
+    '''
+    if n == 0:
+        return 0.0
+    x = np.full(n, 1 / n)
+    est = 0
+    for it in range(max_iter):
+        y = solve(x)
+        est = np.sum(np.abs(y))
+        xi = np.where(y >= 0, 1.0, -1.0)
+        z = solve_transpose(xi)
+        j = np.argmax(np.abs(z))
+        if it > 0 and np.abs(z[j]) <= z @ x:
+            break
+        x = np.zeros(n)
+        x[j] = 1
+    # alternating-sign vector guards against the power-method-like worst cases
+    alt = np.where(np.arange(n) % 2, -1.0, 1.0) * (1 + np.arange(n) / max(n - 1, 1))
+    return max(est, 2 * np.sum(np.abs(solve(alt))) / (3 * n))
+
+
+def is_symmetric(A, rtol=1e-10):
+    '''
+    Check symmetry of a square matrix up to a relative tolerance
+    '''
+    A = np.asarray(A)
+    if len(A.shape) != 2 or A.shape[0] != A.shape[1]:
+        return False
+    return np.max(np.abs(A - A.T), initial=0) <= rtol * np.max(np.abs(A), initial=0)
+
+
+def permutation_sign(piv):
+    '''
+    Sign (+1 or -1) of the permutation given by an index vector
+    '''
+    visited = np.zeros(len(piv), dtype=bool)
+    sign = 1
+    for i in range(len(piv)):
+        if visited[i]:
+            continue
+        j, length = i, 0
+        while not visited[j]:
+            visited[j] = True
+            j = piv[j]
+            length += 1
+        if length % 2 == 0:
+            sign = -sign
+    return sign
+
+
+def stationary_iteration(step, b, x0, eps=0.001, max_iter=100, history=None,
+                         checkpoint=None, checkpoint_every=100, resume_from=None):
+    '''
+    Common loop of the stationary iterative methods x_{k+1} = step(x_k, b)
+
+    For an n x k block of right-hand sides every column is tested for
+    convergence separately and the converged columns are left out of
+    the following steps.
+
+    Input Params
+    ------------
+    step ........... function computing the next approximation, a step
+                     with state (e.g. AdaptiveOmega) provides state() and
+                     restore(state) to be checkpointed with the iteration
+    b .............. right-hand side (vector or n x k block)
+    x0 ............. initial approximation of the shape of b
+    eps ............ tolerance
+    max_iter ....... maximum number of iterations (including those before a resume)
+    history ........ IterationHistory collecting the progress
+    checkpoint ..... path of an .npz file the state is written to every
+                     checkpoint_every iterations and at the end, None for none
+    checkpoint_every number of iterations between checkpoints
+    resume_from .... path of a checkpoint to continue from, x0 is then ignored (may be None)
+
+    Output Params
+    -------------
+    result -> dict (see jacobi)
+    '''
+    history = IterationHistory() if history is None else history
+    if x0 is None and resume_from is not None:
+        x0 = np.zeros(np.shape(b))
+    cols = ColumnTracker(b, x0, history)
+    x, b = np.copy(cols.x), cols.columns(b)
+    start = 0
+    if resume_from is not None:
+        state = load_checkpoint(resume_from)
+        start, x = int(state['it']), cols.restore(state)
+        history.restore(state, cols._report(cols.norm_err))
+        if hasattr(step, 'restore'):
+            step.restore({k[5:]: v for k, v in state.items() if k.startswith('step_')})
+        b = b[:, cols.active]
+    else:
+        cols.record(0, x, None)
+    for it in range(start + 1, max_iter + 1):
+        if cols.done:
+            break
+        x_prev, x = x, np.reshape(step(cols.view(x), cols.view(b)), x.shape)
+        cols.record(it, x, np.linalg.norm(x_prev - x, axis=0))
+        x, b = cols.drop(cols.converged(eps), x, b)
+        if checkpoint is not None and (it % checkpoint_every == 0 or cols.done or it == max_iter):
+            step_state = step.state() if hasattr(step, 'state') else {}
+            save_checkpoint(checkpoint, it=it, **cols.state(x), **history.state(),
+                            **{'step_' + k: v for k, v in step_state.items()})
+    return cols.result(x)
+
+
+def save_checkpoint(path, **state):
+    '''
+    Write the state of an iterative method to an .npz file
+
+    The file is written next to the target and renamed over it, so an
+    interrupted write never leaves a broken checkpoint.
+
+    Input Params
+    ------------
+    path ........... path of the .npz file
+    state .......... arrays (or numbers) to save
+    '''
+    path = os.fspath(path)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **state)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    '''
+    Read the state written by save_checkpoint
+
+    Input Params
+    ------------
+    path ........... path of the .npz file
+
+    Output Params
+    -------------
+    state .......... dict name -> array
+    '''
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+class ColumnTracker:
+    '''
+    Convergence of every column of a block of right-hand sides
+
+    The methods work with n x k blocks of the active columns, one operator
+    application per step serves all of them. Columns that converged are
+    stored and dropped from the working arrays. A vector (or n x 1)
+    right-hand side is a single column, its norms and number of
+    iterations are reported as scalars.
+
+    Input Params
+    ------------
+    b .............. right-hand side (vector or n x k block)
+    x0 ............. initial approximation of the shape of b
+    history ........ IterationHistory collecting the progress
+
+    Attributes
+    ----------
+    x .............. solution (n x k), columns are filled in when they are dropped
+    active ......... indices of the columns still iterated
+    norm_err ....... last norm of every column
+    iters .......... number of iterations of every column
+    '''
+
+    def __init__(self, b, x0, history):
+        self.shape = np.shape(b)
+        n = self.shape[0]
+        self.x = np.reshape(x0, (n, -1)).astype(np.result_type(x0, b, float))
+        k = self.x.shape[1]
+        assert self.x.shape == (n, k) and np.size(b) == n * k, 'x0 must have the shape of b'
+        self.single = k == 1
+        self.active = np.arange(k)
+        self.norm_err = np.full(k, np.inf)
+        self.iters = np.zeros(k, dtype=int)
+        self.history = history
+
+    @property
+    def done(self):
+        return len(self.active) == 0
+
+    def columns(self, b):
+        '''
+        Right-hand side (or any array of the shape of b) as an n x k block
+        '''
+        b = np.asarray(b)
+        return b.reshape(self.shape[0], -1).astype(np.result_type(b, float))
+
+    def view(self, v):
+        '''
+        Block of active columns in the shape passed to the operators,
+        the shape of b for a single column
+        '''
+        return v.reshape(self.shape) if self.single else v
+
+    def apply(self, op, v):
+        '''
+        Product op @ v with the block of active columns
+        '''
+        return np.reshape(op @ self.view(v), v.shape)
+
+    def record(self, it, x, norm_err, iters=None):
+        '''
+        Record one iteration of the active columns
+
+        Input Params
+        ------------
+        it ............. iteration number
+        x .............. approximation of the active columns (None if not formed)
+        norm_err ....... norms of the active columns (None for the initial approximation)
+        iters .......... iteration numbers of the active columns, if they differ from it
+        '''
+        self.iters[self.active] = it if iters is None else iters
+        if norm_err is not None:
+            self.norm_err[self.active] = norm_err
+            norm_err = self._report(self.norm_err)
+        if x is not None and self.history.wants_x:
+            self.x[:, self.active] = x
+            x = self.x.reshape(self.shape)
+        else:
+            x = None
+        self.history.record(it, x, norm_err)
+
+    def converged(self, eps):
+        '''
+        Mask of the active columns with norm_err < eps
+        '''
+        return self.norm_err[self.active] < eps
+
+    def drop(self, stop, x, *arrays):
+        '''
+        Store the approximation of the stopped columns and stop iterating them
+
+        Input Params
+        ------------
+        stop ........... mask of the active columns to drop
+        x .............. approximation of the active columns
+        arrays ......... other working arrays, columns along the last axis
+
+        Output Params
+        -------------
+        x, *arrays ..... working arrays with only the remaining columns
+        '''
+        if np.any(stop):
+            keep = ~stop
+            self.x[:, self.active[stop]] = x[:, stop]
+            self.active = self.active[keep]
+            x, arrays = x[:, keep], [a[..., keep] for a in arrays]
+        return (x, *arrays)
+
+    def state(self, x):
+        '''
+        Arrays describing the progress, x is the approximation of the active columns
+        '''
+        self.x[:, self.active] = x
+        return {'x': self.x, 'active': self.active, 'norm_err': self.norm_err, 'iters': self.iters}
+
+    def restore(self, state):
+        '''
+        Continue from the arrays returned by state, returns the approximation
+        of the active columns
+        '''
+        assert state['x'].shape == self.x.shape, 'checkpoint does not match the shape of b'
+        self.x = state['x'].astype(self.x.dtype)
+        self.active = state['active']
+        self.norm_err = state['norm_err']
+        self.iters = state['iters']
+        return self.x[:, self.active]
+
+    def result(self, x):
+        '''
+        Result dict with x as the approximation of the active columns
+        '''
+        self.x[:, self.active] = x
+        iters = int(self.iters[0]) if self.single else np.copy(self.iters)
+        return self.history.result(self.x.reshape(self.shape), iters)
+
+    def _report(self, values):
+        return values[0] if self.single else np.copy(values)
+
+
+class IterationHistory:
+    '''
+    Progress of an iterative method, kept only as far as requested
+
+    Input Params
+    ------------
+    trace .......... history kept in the result
+            full ..... all approximations and norms
+            last ..... last trace_size approximations and all norms
+            norms .... only norms
+            none ..... neither
+    trace_size ..... number of approximations kept with trace='last'
+    callback ....... function callback(it, x, norm_err) called after every iteration
+                     (it = 0 for the initial approximation)
+    show_progress .. print progress of computation
+    '''
+
+    def __init__(self, trace='full', trace_size=10, callback=None, show_progress=False):
+        assert trace in ('full', 'last', 'norms', 'none')
+        self.trace = trace
+        self.x_vals = deque(maxlen=trace_size) if trace == 'last' else []
+        self.norm_err_vals = []
+        self.norm_err = None
+        self.callbacks = [f for f in (callback, print_progress if show_progress else None) if f is not None]
+
+    @property
+    def wants_x(self):
+        '''
+        Approximations are kept in the trace or passed to a callback
+        '''
+        return self.trace in ('full', 'last') or len(self.callbacks) > 0
+
+    def record(self, it, x, norm_err, iters=None):
+        '''
+        Record one iteration, x may be None when the method does not form it
+        '''
+        self.norm_err = norm_err
+        if x is not None and self.trace in ('full', 'last'):
+            self.x_vals.append(np.copy(x))
+        if self.trace != 'none':
+            self.norm_err_vals.append(norm_err)
+        for f in self.callbacks:
+            f(it, x, norm_err)
+
+    def state(self):
+        '''
+        Norms of the trace as arrays for a checkpoint (approximations are not saved)
+        '''
+        if self.trace == 'none':
+            return {}
+        # the initial approximation has no norm
+        return {'norm_err_vals': np.array(self.norm_err_vals[1:])}
+
+    def restore(self, state, norm_err):
+        '''
+        Continue the trace from a checkpoint
+        '''
+        self.norm_err = norm_err
+        if self.trace != 'none' and 'norm_err_vals' in state:
+            self.norm_err_vals = [None] + list(state['norm_err_vals'])
+
+    def result(self, x, it):
+        '''
+        Result dict of the iterative methods
+        '''
+        result = {
+            'x_approx': x,
+            'norm_err': self.norm_err,
+            'iters': it,
+            'x_vals': list(self.x_vals) if self.trace in ('full', 'last') else None,
+            'norm_err_vals': self.norm_err_vals if self.trace != 'none' else None,
+        }
+        return result
+
+
+def print_progress(it, x, norm_err):
+    '''
+    Callback printing the progress of an iterative method
+    '''
+    if it == 0:
+        print(f'Initial approximation x0 = {np.ravel(x)}')
+    else:
+        print(f'Iteration: {it}')
+        if x is None:
+            print(f'norm_err = {norm_err}')
+        else:
+            print(f'x = {np.ravel(x)}, norm_err = {norm_err}')
+    print()
+
+
+def save_iterations(f):
+    '''
+    Callback writing every approximation to an open binary file
+
+    The approximations are not kept in memory, read them back by
+    repeated np.load(f).
+
+    Input Params
+    ------------
+    f .............. file opened for binary writing
+
+    Output Params
+    -------------
+    callback ....... function callback(it, x, norm_err)
+    '''
+    def callback(it, x, norm_err):
+        if x is not None:
+            np.save(f, x)
+    return callback
+
+
+def column(v, x):
+    '''
+    Reshape vector v so that it broadcasts along the rows of x
+    '''
+    return np.reshape(v, (-1,) + (1,) * (np.ndim(x) - 1))
@@ -0,0 +1,4 @@
+from .csr import CSRMatrix, LevelSchedule
+from .triangular import spsolve_triangular
+from .incomplete import incomplete_cholesky
+from .coloring import greedy_coloring
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def greedy_coloring(A):
+    '''
+    Multicolor ordering of the unknowns from the sparsity pattern
+
+    Unknowns i and j get different colors whenever a_ij or a_ji is nonzero,
+    so all unknowns of one color can be relaxed simultaneously. Rows are
+    colored greedily in natural order, which gives the red-black ordering
+    for 5-point (7-point) stencils on regular grids.
+
+    Input Params
+    ------------
+    A .............. square CSRMatrix
+
+    Output Params
+    -------------
+    colors ......... list of index arrays, one per color
+    '''
+    n = A.shape[0]
+    S = A.transpose()
+    ptr, idx = A.indptr.tolist(), A.indices.tolist()
+    ptr_t, idx_t = S.indptr.tolist(), S.indices.tolist()
+    color = [-1] * n
+    for i in range(n):
+        used = {color[j] for j in idx[ptr[i]:ptr[i+1]]}
+        used.update(color[j] for j in idx_t[ptr_t[i]:ptr_t[i+1]])
+        c = 0
+        while c in used:
+            c += 1
+        color[i] = c
+    color = np.array(color, dtype=np.intp)
+    return [np.flatnonzero(color == c) for c in range(color.max() + 1 if n else 0)]
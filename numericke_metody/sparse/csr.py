@@ -0,0 +1,245 @@
+import numpy as np
+
+
+class CSRMatrix:
+    '''
+    Sparse matrix in compressed sparse row (CSR) format
+
+    Row i holds the values data[indptr[i]:indptr[i+1]] in the columns
+    indices[indptr[i]:indptr[i+1]] (sorted, without duplicates).
+
+    Input Params
+    ------------
+    data ........... nonzero values
+    indices ........ column indices of the values
+    indptr ......... row pointers (length n_rows + 1)
+    shape .......... (n_rows, n_cols)
+    '''
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.shape = tuple(shape)
+        assert len(self.indptr) == self.shape[0] + 1
+        assert len(self.data) == len(self.indices) == self.indptr[-1]
+        self._row_ids = None
+        self._schedules = {}
+
+    @classmethod
+    def from_dense(cls, A, tol=0):
+        '''
+        Build CSR matrix from a dense array, entries with |a_ij| <= tol are dropped
+        '''
+        A = np.asarray(A)
+        assert len(A.shape) == 2
+        rows, cols = np.nonzero(np.abs(A) > tol)
+        indptr = np.zeros(A.shape[0] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=A.shape[0]), out=indptr[1:])
+        return cls(A[rows, cols], cols, indptr, A.shape)
+
+    @classmethod
+    def from_coo(cls, rows, cols, vals, shape):
+        '''
+        Build CSR matrix from coordinate triplets, duplicate entries are summed
+        '''
+        rows, cols = np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+        vals = np.asarray(vals)
+        order = np.lexsort((cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        if len(rows):
+            first = np.concatenate(([True], (np.diff(rows) != 0) | (np.diff(cols) != 0)))
+            starts = np.flatnonzero(first)
+            vals = np.add.reduceat(vals, starts)
+            rows, cols = rows[starts], cols[starts]
+        indptr = np.zeros(shape[0] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(vals, cols, indptr, shape)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def row_ids(self):
+        '''
+        Row index of every stored entry
+        '''
+        if self._row_ids is None:
+            self._row_ids = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return self._row_ids
+
+    def toarray(self):
+        '''
+        Dense copy of the matrix
+        '''
+        A = np.zeros(self.shape, dtype=self.dtype)
+        A[self.row_ids, self.indices] = self.data
+        return A
+
+    def dot(self, x, chunk_size=2**15):
+        '''
+        Matrix-vector (or matrix-matrix) product A @ x in O(nnz) operations
+
+        Rows are processed in chunks of about chunk_size products, so that
+        the temporary products of a block x (n x k) stay in cache.
+        '''
+        x = np.asarray(x)
+        x2 = x.reshape(x.shape[0], -1)
+        n, k = self.shape[0], x2.shape[1]
+        y = np.empty((n, k), dtype=np.result_type(self.data, x))
+        rows = max(1, chunk_size * n // max(self.nnz * k, 1))
+        for i0 in range(0, n, rows):
+            i1 = min(i0 + rows, n)
+            e0, e1 = self.indptr[i0], self.indptr[i1]
+            products = self.data[e0:e1, None] * x2[self.indices[e0:e1]]
+            y[i0:i1] = segment_sum(products, self.indptr[i0:i1+1] - e0)
+        return y.reshape((n,) + x.shape[1:])
+
+    def __matmul__(self, x):
+        return self.dot(x)
+
+    def diagonal(self):
+        '''
+        Main diagonal of the matrix
+        '''
+        d = np.zeros(min(self.shape), dtype=self.dtype)
+        mask = self.row_ids == self.indices
+        d[self.indices[mask]] = self.data[mask]
+        return d
+
+    def tril(self, k=0):
+        '''
+        Lower triangular part (entries with j - i <= k)
+        '''
+        return self._select(self.indices - self.row_ids <= k)
+
+    def triu(self, k=0):
+        '''
+        Upper triangular part (entries with j - i >= k)
+        '''
+        return self._select(self.indices - self.row_ids >= k)
+
+    def take_rows(self, rows):
+        '''
+        Matrix made of the given rows (in the given order)
+        '''
+        rows = np.asarray(rows, dtype=np.intp)
+        counts = self.indptr[rows + 1] - self.indptr[rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.intp)
+        np.cumsum(counts, out=indptr[1:])
+        entries = np.arange(indptr[-1]) + np.repeat(self.indptr[rows] - indptr[:-1], counts)
+        return CSRMatrix(self.data[entries], self.indices[entries], indptr, (len(rows), self.shape[1]))
+
+    def transpose(self):
+        '''
+        Transposed matrix
+        '''
+        return CSRMatrix.from_coo(self.indices, self.row_ids, self.data, self.shape[::-1])
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def level_schedule(self, lower=True):
+        '''
+        Level schedule of the strictly lower (upper) triangle, cached
+
+        Rows of one level do not depend on each other in a forward (backward)
+        substitution, so each level can be updated by one array operation.
+        '''
+        if lower not in self._schedules:
+            self._schedules[lower] = LevelSchedule(self, lower)
+        return self._schedules[lower]
+
+    def _select(self, mask):
+        indptr = np.zeros(self.shape[0] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.row_ids[mask], minlength=self.shape[0]), out=indptr[1:])
+        return CSRMatrix(self.data[mask], self.indices[mask], indptr, self.shape)
+
+
+class LevelSchedule:
+    '''
+    Rows of a sparse triangle grouped into independent levels
+
+    Input Params
+    ------------
+    A .............. square CSR matrix, only its strictly lower (upper) triangle is used
+    lower .......... schedule for forward (True) or backward (False) substitution
+    '''
+
+    def __init__(self, A, lower=True):
+        n = A.shape[0]
+        strict = A.indices < A.row_ids if lower else A.indices > A.row_ids
+        indptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(A.row_ids[strict], minlength=n), out=indptr[1:])
+        indices, data = A.indices[strict], A.data[strict]
+        level = _levels(indptr, indices, lower)
+        order = np.argsort(level, kind='stable')
+        counts = np.diff(indptr)[order]
+        self.rows = order
+        self.row_ptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(counts, out=self.row_ptr[1:])
+        entries = np.arange(self.row_ptr[-1]) + np.repeat(indptr[order] - self.row_ptr[:-1], counts)
+        self.indices, self.data = indices[entries], data[entries]
+        self.level_ptr = np.searchsorted(level[order], np.arange(level.max() + 2 if n else 1))
+
+    @property
+    def n_levels(self):
+        return len(self.level_ptr) - 1
+
+    def solve(self, rhs, diag, scale=1):
+        '''
+        Substitution (D + scale * T) x = rhs, T is the scheduled strict triangle
+
+        Input Params
+        ------------
+        rhs ............ right-hand side (n or n x k)
+        diag ........... diagonal D
+        scale .......... factor of the strict triangle
+
+        Output Params
+        -------------
+        x .............. solution of the same shape as rhs
+        '''
+        x = np.array(rhs, dtype=np.result_type(rhs, diag, self.data))
+        x2 = x.reshape(x.shape[0], -1)
+        diag = diag[:, None]
+        for l in range(self.n_levels):
+            r0, r1 = self.level_ptr[l], self.level_ptr[l+1]
+            rows = self.rows[r0:r1]
+            e0, e1 = self.row_ptr[r0], self.row_ptr[r1]
+            if e1 > e0:
+                products = self.data[e0:e1, None] * x2[self.indices[e0:e1]]
+                sums = segment_sum(products, self.row_ptr[r0:r1+1] - e0)
+                x2[rows] = (x2[rows] - scale * sums) / diag[rows]
+            else:
+                x2[rows] /= diag[rows]
+        return x
+
+
+def segment_sum(values, indptr):
+    '''
+    Sums of consecutive segments values[indptr[i]:indptr[i+1]] along the first axis
+    '''
+    n = len(indptr) - 1
+    out = np.zeros((n,) + values.shape[1:], dtype=values.dtype)
+    nonempty = indptr[:-1] < indptr[1:]
+    if np.any(nonempty):
+        out[nonempty] = np.add.reduceat(values, indptr[:-1][nonempty], axis=0)
+    return out
+
+
+def _levels(indptr, indices, lower):
+    n = len(indptr) - 1
+    level = [0] * n
+    ptr, idx = indptr.tolist(), indices.tolist()
+    for i in (range(n) if lower else reversed(range(n))):
+        deps = idx[ptr[i]:ptr[i+1]]
+        if deps:
+            level[i] = max(level[j] for j in deps) + 1
+    return np.array(level, dtype=np.intp)
@@ -0,0 +1,44 @@
+import numpy as np
+from .csr import CSRMatrix
+
+
+def incomplete_cholesky(A):
+    '''
+    Incomplete Cholesky factorization IC(0)
+
+    L has the sparsity pattern of the lower triangle of A and
+    L @ L.T agrees with A on that pattern.
+
+    Input Params
+    ------------
+    A .............. symmetric CSRMatrix with nonzero diagonal
+
+    Output Params
+    -------------
+    L .............. lower triangular CSRMatrix
+    '''
+    T = A.tril()
+    n = T.shape[0]
+    data = T.data.astype(np.result_type(T.data, float))
+    indptr, indices = T.indptr, T.indices
+    assert np.all(indices[indptr[1:] - 1] == np.arange(n)), 'diagonal of A must be nonzero'
+    position = np.full(n, -1)
+    for i in range(n):
+        s, e = indptr[i], indptr[i+1]
+        position[indices[s:e]] = np.arange(s, e)
+        # entries in increasing column order, the diagonal is the last one
+        for p in range(s, e):
+            k = indices[p]
+            ks, ke = indptr[k], indptr[k+1] - 1
+            q = position[indices[ks:ke]]
+            found = q >= 0
+            dot = data[q[found]] @ data[ks:ke][found]
+            if k < i:
+                data[p] = (data[p] - dot) / data[ke]
+            else:
+                pivot = data[p] - dot
+                if not pivot > 0:
+                    raise np.linalg.LinAlgError(f'Incomplete Cholesky breaks down in row {i}')
+                data[p] = np.sqrt(pivot)
+        position[indices[s:e]] = -1
+    return CSRMatrix(data, indices, indptr, T.shape)
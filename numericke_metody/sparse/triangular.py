@@ -0,0 +1,23 @@
+import numpy as np
+
+
+def spsolve_triangular(T, b, lower=True, unit_diagonal=False):
+    '''
+    Solve sparse triangular system T x = b
+
+    Rows are substituted level by level (see CSRMatrix.level_schedule),
+    the schedule is computed once and cached on T.
+
+    Input Params
+    ------------
+    T .............. square CSRMatrix, only its lower (upper) triangle is used
+    b .............. right-hand side vector or matrix (n x k)
+    lower .......... use the lower triangle of T
+    unit_diagonal .. assume ones on the diagonal of T
+
+    Output Params
+    -------------
+    x .............. solution of the same shape as b
+    '''
+    diag = np.ones(T.shape[0]) if unit_diagonal else T.diagonal()
+    return T.level_schedule(lower).solve(b, diag)